@@ -1,82 +1,192 @@
-import time
-import os
-from alpaca_trade_api import REST
-from transformers import pipeline
+from alpaca_trade_api import REST, Stream
+import argparse
 import logging
-from importlib import import_module
-import json
+import os
+import sys
+import threading
+import bar_cache
+import execution
+import metrics
+import risk
+from presets import list_presets, load_preset, load_preset_dir, save_preset
+from rest_client import RateLimitedREST
+from scheduler import Job, PresetWatcher, Scheduler
+from store import STORE_DIR, BarStore
+from streaming import BarStream
 
 # === Configuration ===
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Initialize sentiment analysis pipeline
-try:
-    sentiment_pipeline = pipeline("sentiment-analysis")
-except Exception as e:
-    logging.error(f"Failed to initialize sentiment pipeline: {e}")
-    exit(1)
-
-# === Helper Functions ===
+DEFAULT_BASE_URL = "https://paper-api.alpaca.markets"
 
-def load_preset(preset_name):
-    """Loads a preset from a JSON file."""
+def load_credentials():
+    """Returns (api_key, secret_key, base_url) from the environment, reading a .env file first if present."""
     try:
-        with open(f"presets/{preset_name}.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logging.error(f"Preset '{preset_name}' not found.")
-        return None
-
-def save_preset(preset_name, params):
-    """Saves parameters as a preset in a JSON file."""
-    os.makedirs("presets", exist_ok=True)
-    with open(f"presets/{preset_name}.json", "w") as f:
-        json.dump(params, f, indent=4)
+        from dotenv import load_dotenv
+    except ImportError:
+        pass
+    else:
+        load_dotenv()
+    return os.getenv("ALPACA_API_KEY"), os.getenv("ALPACA_SECRET_KEY"), os.getenv("ALPACA_BASE_URL") or DEFAULT_BASE_URL
 
 # === Main Bot Loop ===
 
-def run_bot(api_key, secret_key, base_url, symbol, dollar_amount, check_interval, strategy, **strategy_kwargs):
-    try:
-        api = REST(api_key, secret_key, base_url=base_url)
-        try:
-            strategy_module = import_module(f"strategies.{strategy}")
-        except ImportError:
-            logging.error(f"Strategy '{strategy}' not found in 'strategies' directory.")
-            return
+class _Streams:
+    """Opens Alpaca's websocket the first time it is needed and keeps bar subscriptions in step with the jobs."""
 
-        while True:
-            # Debugging: Print dollar_amount
-            print(f"Debugging: dollar_amount in run_bot: {dollar_amount}")
+    def __init__(self, api_key, secret_key, base_url, api, scheduler, trade_updates):
+        self.credentials = (api_key, secret_key, base_url)
+        self.api = api
+        self.scheduler = scheduler
+        self.trade_updates = trade_updates
+        self.bars = None
 
+    def sync(self, jobs):
+        symbols = {job.symbol for job in jobs if job.event_driven}
+        if self.bars is not None:
+            self.bars.subscribe(symbols)
+            return
+        if not (symbols or self.trade_updates):
+            return
+        api_key, secret_key, base_url = self.credentials
+        stream = Stream(api_key, secret_key, base_url=base_url)
+        self.bars = BarStream(self.scheduler, stream)
+        self.bars.subscribe(symbols)
+        if self.trade_updates:
+            execution.gateway_for(self.api).attach(stream)
+        threading.Thread(target=stream.run, name="stream", daemon=True).start()
+
+def run_fleet(api_key, secret_key, base_url, jobs, max_workers=8, stream_trade_updates=False, store_dir=STORE_DIR,
+              metrics_port=None, metrics_file=None, risk_limits=None, preset_dir=None, reload_interval=2.0):
+    """Runs many (symbol, strategy) jobs in one process against a shared API client.
+
+    Jobs with a check interval of 0 run whenever a new minute bar for their
+    symbol arrives on Alpaca's market data stream; their strategies must use
+    the 1Min timeframe. With
+    `stream_trade_updates`, positions are kept current from the trade update
+    stream instead of being polled every tick. Bars are persisted under
+    `store_dir` (None to disable) so restarts only fetch what is missing.
+
+    Per-stage latency metrics are collected only when `metrics_port` (or
+    the METRICS_PORT environment variable) or `metrics_file` (METRICS_FILE)
+    is set: the port serves Prometheus text on /metrics, the file receives
+    a JSON summary with p50/p99 every minute.
+
+    `risk_limits` (e.g. {"max_gross": 50000, "max_sector": 20000,
+    "sectors": {"AAPL": "tech"}}) enables the portfolio allocator, which
+    sizes all of a tick's signals together under those limits instead of
+    each strategy sizing its own order against buying power.
+
+    With `preset_dir`, the jobs of every preset in that directory are run
+    as well, and the directory is checked every `reload_interval` seconds
+    (0 to disable) so edited, added and removed presets are applied to the
+    running fleet (see `scheduler.PresetWatcher`).
+    """
+    try:
+        api = RateLimitedREST(REST(api_key, secret_key, base_url=base_url))
+        metrics_port = metrics_port or os.getenv("METRICS_PORT")
+        metrics_file = metrics_file or os.getenv("METRICS_FILE")
+        if metrics_port:
+            metrics.serve(metrics_port)
+        if metrics_file:
+            metrics.dump_periodically(metrics_file)
+        if store_dir:
+            bar_cache.shared_cache.store = BarStore(store_dir)
+        if risk_limits is not None:
+            risk.enable(api, **risk_limits)
+        scheduler = Scheduler(api, max_workers=max_workers)
+        for job in jobs:
             try:
-                strategy_module.trade_logic(symbol, dollar_amount, api, **strategy_kwargs)
-            except Exception as e:
-                logging.error(f"Error executing strategy '{strategy}': {e}")
-            time.sleep(int(check_interval))
+                scheduler.add_job(job)
+            except ValueError as e:
+                logging.error(f"Cannot schedule {job.name}: {e}")
+                return
+
+        scheduler.start()  # before the stream opens, so no early bar is dropped
+        streams = _Streams(api_key, secret_key, base_url, api, scheduler, stream_trade_updates)
+        if preset_dir:
+            watcher = PresetWatcher(preset_dir, scheduler, interval=reload_interval, on_change=streams.sync)
+            watcher.sync()
+            if reload_interval:
+                watcher.start()
+        streams.sync(scheduler.jobs)
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        logging.info("Stopping bot.")
     except Exception as e:
         logging.error(f"Bot execution error: {e}")
 
+def run_bot(api_key, secret_key, base_url, symbol, dollar_amount, check_interval, strategy, risk_limits=None,
+            stream_trade_updates=False, **strategy_kwargs):
+    """Runs one strategy over one or more comma-separated symbols."""
+    symbols = [s.strip().upper() for s in str(symbol).split(",") if s.strip()]
+    jobs = [Job(s, strategy, dollar_amount, check_interval, strategy_kwargs) for s in symbols]
+    run_fleet(api_key, secret_key, base_url, jobs, stream_trade_updates=stream_trade_updates, risk_limits=risk_limits)
+
+def run_headless(preset_dir, reload_interval=2.0, stream_trade_updates=False):
+    """Runs every preset in `preset_dir` in one process, without prompts.
+
+    Credentials come from ALPACA_API_KEY, ALPACA_SECRET_KEY and
+    ALPACA_BASE_URL (or a .env file). The first preset with a "risk" entry
+    sets the portfolio limits; those are read once at startup, as is a
+    true "stream_trade_updates" in any preset. Returns 1 if the bot could
+    not be started.
+    """
+    if not os.path.isdir(preset_dir):
+        logging.error(f"Preset directory '{preset_dir}' does not exist.")
+        return 1
+    api_key, secret_key, base_url = load_credentials()
+    presets = load_preset_dir(preset_dir)
+    if not (api_key and secret_key):
+        keyed = [params for params in presets.values() if params.get("api_key") and params.get("secret_key")]
+        if not keyed:
+            logging.error("Set ALPACA_API_KEY and ALPACA_SECRET_KEY (or add them to .env) to run headless.")
+            return 1
+        logging.warning("Using API keys stored in a preset; prefer ALPACA_API_KEY/ALPACA_SECRET_KEY.")
+        api_key, secret_key = keyed[0]["api_key"], keyed[0]["secret_key"]
+        base_url = keyed[0].get("base_url", base_url)
+    risk_limits = next((params["risk"] for params in presets.values() if params.get("risk") is not None), None)
+    stream_trade_updates = stream_trade_updates or any(p.get("stream_trade_updates") for p in presets.values())
+    logging.info(f"Starting {len(presets)} presets from {preset_dir}.")
+    run_fleet(api_key, secret_key, base_url, [], stream_trade_updates=stream_trade_updates, risk_limits=risk_limits,
+              preset_dir=preset_dir, reload_interval=reload_interval)
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alpaca trading bot. Without options, asks for its settings.")
+    parser.add_argument("--presets", metavar="DIR",
+                        help="run every preset in DIR without prompts, applying edits to the presets while running")
+    parser.add_argument("--reload-interval", type=float, default=2.0,
+                        help="seconds between checks of the preset directory (0 to disable)")
+    parser.add_argument("--stream-trade-updates", action="store_true",
+                        help="track orders and positions from Alpaca's trade update stream instead of polling")
+    args = parser.parse_args()
+    if args.presets:
+        sys.exit(run_headless(args.presets, reload_interval=args.reload_interval,
+                              stream_trade_updates=args.stream_trade_updates))
+
     use_preset = input("Use preset? (yes/no): ").lower() == "yes"
 
     try:
         if use_preset:
             try:
-                presets = [f.split(".json")[0] for f in os.listdir("presets") if f.endswith(".json")]
+                presets = list_presets()
                 print("Available presets:", presets)
                 preset_name = input("Enter preset name: ")
                 params = load_preset(preset_name)
                 if params:
-                    api_key = params["api_key"]
-                    secret_key = params["secret_key"]
-                    base_url = params.get("base_url", "https://paper-api.alpaca.markets")
+                    # Presets written by sweep.py carry no credentials
+                    api_key = params.get("api_key") or input("Enter Alpaca API Key: ")
+                    secret_key = params.get("secret_key") or input("Enter Alpaca Secret Key: ")
+                    base_url = params.get("base_url", DEFAULT_BASE_URL)
                     symbol = params["symbol"]
                     dollar_amount = params["dollar_amount"]
                     check_interval = params["check_interval"]
                     strategy = params["strategy"]
                     strategy_kwargs = params.get("strategy_kwargs", {})
+                    risk_limits = params.get("risk")
+                    stream_trade_updates = args.stream_trade_updates or bool(params.get("stream_trade_updates"))
                 else:
                     exit()
             except FileNotFoundError:
@@ -85,8 +195,10 @@ if __name__ == "__main__":
         if not use_preset:
             api_key = input("Enter Alpaca API Key: ")
             secret_key = input("Enter Alpaca Secret Key: ")
-            base_url = input("Enter Alpaca Base URL (default: https://paper-api.alpaca.markets): ") or "https://paper-api.alpaca.markets"
-            symbol = input("Enter Stock Symbol (default: AAPL): ") or "AAPL"
+            base_url = input("Enter Alpaca Base URL (default: https://paper-api.alpaca.markets): ") or DEFAULT_BASE_URL
+            symbol = input("Enter Stock Symbol(s), comma-separated (default: AAPL): ") or "AAPL"
+            risk_limits = None
+            stream_trade_updates = args.stream_trade_updates
             while True:
                 try:
                     dollar_amount = float(input("Enter Dollar Amount to Trade: "))
@@ -97,7 +209,7 @@ if __name__ == "__main__":
                 except ValueError:
                     print("Invalid input. Please enter a number.")
 
-            check_interval = int(input("Enter Check Interval (seconds, default: 10): ") or 10)
+            check_interval = int(input("Enter Check Interval (seconds, 0 = on every new minute bar, default: 10): ") or 10)
             strategy = input("Enter Trading Strategy (sentiment, moving_average): ") or "sentiment"
 
             strategy_kwargs = {}
@@ -122,10 +234,8 @@ if __name__ == "__main__":
                 }
                 save_preset(preset_name, params)
 
-        # Debugging: Print dollar_amount
-        print(f"Debugging: dollar_amount before run_bot: {dollar_amount}")
-
-        run_bot(api_key, secret_key, base_url, symbol, dollar_amount, check_interval, strategy, **strategy_kwargs)
+        run_bot(api_key, secret_key, base_url, symbol, dollar_amount, check_interval, strategy,
+                risk_limits=risk_limits, stream_trade_updates=stream_trade_updates, **strategy_kwargs)
     except Exception as e:
         print(f"An error occurred during input: {e}")
         
\ No newline at end of file
@@ -0,0 +1,254 @@
+import argparse
+import bisect
+import json
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import signals
+import store
+
+# === Loading Bars ===
+
+_COLUMN_ALIASES = {
+    "timestamp": "t", "time": "t", "date": "t", "datetime": "t",
+    "open": "o", "high": "h", "low": "l", "close": "c", "volume": "v",
+}
+
+def load_bars(path):
+    """Load OHLCV bars from a CSV or Parquet file into a frame indexed by UTC time.
+
+    Columns may use Alpaca's short names (t, o, h, l, c, v) or the long ones
+    (timestamp, open, high, low, close, volume). `path` may also be a series
+    directory of the bot's bar store, e.g. market_data/1Min/AAPL.
+    """
+    if store.is_series_dir(path):
+        return store.read_series(path).to_frame()
+    if str(path).endswith((".parquet", ".pq")):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df = df.rename(columns=lambda col: _COLUMN_ALIASES.get(col.lower(), col.lower()))
+    missing = {"t", "c"} - set(df.columns)
+    if missing:
+        raise ValueError(f"Bar file {path} is missing columns: {sorted(missing)}")
+    df["t"] = pd.to_datetime(df["t"], utc=True)
+    return df.set_index("t").sort_index()
+
+# === Vectorized Simulation ===
+
+def simulate(close, signal, dollar_amount, slippage_bps=0.0, commission=0.0):
+    """Turn a per-bar signal into positions, fills and an equity curve.
+
+    Mirrors the live order logic: a +1/-1 signal moves to a long/short
+    position of `int(dollar_amount / price)` shares unless already on that
+    side, and 0 keeps the current position. Fills happen at the signal bar's
+    close, adjusted by `slippage_bps`, with a flat `commission` per order.
+    Returns a dict of arrays aligned with `close`.
+    """
+    close = np.asarray(close, dtype=float)
+    signal = np.asarray(signal)
+    n = len(close)
+
+    # Carry the last non-zero signal forward to get the desired side per bar.
+    last_signal = np.maximum.accumulate(np.where(signal != 0, np.arange(n), 0))
+    side = np.where((signal != 0).cumsum() > 0, signal[last_signal], 0)
+    prev_side = np.concatenate(([0], side[:-1]))
+    changed = side != prev_side
+
+    # Size each new position at entry and hold the share count until the next change.
+    entry = np.maximum.accumulate(np.where(changed, np.arange(n), 0))
+    target = side * np.floor(dollar_amount / close)
+    shares = np.where(side != 0, target[entry], 0.0)
+
+    trades = np.diff(shares, prepend=0.0)
+    traded = trades != 0
+    fill_price = close * (1.0 + np.sign(trades) * slippage_bps / 1e4)
+    cash = -np.cumsum(trades * fill_price) - commission * np.cumsum(traded)
+    equity = cash + shares * close
+    return {
+        "shares": shares,
+        "trades": trades,
+        "fill_price": fill_price,
+        "cash": cash,
+        "equity": equity,
+    }
+
+def summarize(sim, dollar_amount):
+    """Compute PnL, drawdown and turnover from the output of `simulate`."""
+    equity = sim["equity"]
+    traded = sim["trades"] != 0
+    peak = np.maximum.accumulate(equity)
+    drawdown = equity - peak
+    notional = np.abs(sim["trades"] * sim["fill_price"]).sum()
+    return {
+        "pnl": float(equity[-1]) if len(equity) else 0.0,
+        "max_drawdown": float(drawdown.min()) if len(equity) else 0.0,
+        "max_drawdown_pct": float((drawdown / (dollar_amount + peak)).min()) if len(equity) else 0.0,
+        "orders": int(traded.sum()),
+        "turnover": float(notional / dollar_amount),
+    }
+
+class BacktestResult:
+    """Fills, equity curve and summary statistics of one backtest."""
+
+    def __init__(self, index, sim, summary):
+        self.summary = summary
+        self.equity = pd.Series(sim["equity"], index=index, name="equity")
+        traded = sim["trades"] != 0
+        self.fills = pd.DataFrame({
+            "side": np.where(sim["trades"][traded] > 0, "buy", "sell"),
+            "qty": np.abs(sim["trades"][traded]).astype(int),
+            "price": sim["fill_price"][traded],
+        }, index=index[traded])
+
+    def __repr__(self):
+        return f"BacktestResult({self.summary})"
+
+def backtest(bars, strategy, dollar_amount, slippage_bps=0.0, commission=0.0, **strategy_kwargs):
+    """Backtest a strategy over a bar frame (see `load_bars`) in one vectorized pass."""
+    close = bars["c"].to_numpy(dtype=float)
+    signal = signals.compute_signal(strategy, close, **strategy_kwargs)
+    sim = simulate(close, signal, dollar_amount, slippage_bps, commission)
+    return BacktestResult(bars.index, sim, summarize(sim, dollar_amount))
+
+# === Offline Replay Through the Live Strategy ===
+
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+class _StubBar:
+    __slots__ = ("_raw",)
+
+    def __init__(self, raw):
+        self._raw = raw
+
+class StubAPI:
+    """Offline stand-in for the parts of `alpaca_trade_api.REST` the strategies use.
+
+    Serves bars from local frames up to a cursor set with `advance`, fills
+    market orders immediately at the current close and tracks cash and
+    positions. Useful for checking that a live strategy behaves like its
+    vectorized signal.
+    """
+
+    def __init__(self, bars_by_symbol, cash=100000.0):
+        self.cash = float(cash)
+        self.positions = {}
+        self.orders = []
+        self._cursor = {}
+        self._stamps = {}
+        self._raw = {}
+        for symbol, df in bars_by_symbol.items():
+            stamps = list(df.index.strftime(_TIME_FORMAT))
+            cols = {k: df[k].to_numpy() for k in ("o", "h", "l", "c", "v") if k in df}
+            self._raw[symbol] = [
+                dict({"t": stamp}, **{k: float(col[i]) for k, col in cols.items()})
+                for i, stamp in enumerate(stamps)
+            ]
+            self._stamps[symbol] = stamps
+            self._cursor[symbol] = 0
+
+    def advance(self, symbol, index):
+        """Make bar `index` of `symbol` the most recent one visible to strategies."""
+        self._cursor[symbol] = index
+
+    def _last(self, symbol):
+        return self._raw[symbol][self._cursor[symbol]]
+
+    def get_bars(self, symbol, timeframe, start=None, limit=None, **kwargs):
+        return [_StubBar(raw) for raw in self.get_bars_iter(symbol, timeframe, start=start, limit=limit, raw=True)]
+
+    def get_bars_iter(self, symbol, timeframe, start=None, limit=None, raw=False, **kwargs):
+        end = self._cursor[symbol] + 1
+        first = 0
+        if start is not None:
+            start = pd.Timestamp(start)
+            start = start.tz_localize("UTC") if start.tzinfo is None else start.tz_convert("UTC")
+            first = bisect.bisect_left(self._stamps[symbol], start.strftime(_TIME_FORMAT), 0, end)
+        if limit is not None:
+            first = max(first, end - int(limit))
+        for bar in self._raw[symbol][first:end]:
+            yield bar if raw else _StubBar(bar)
+
+    def get_latest_trade(self, symbol):
+        return SimpleNamespace(symbol=symbol, price=self._last(symbol)["c"])
+
+    def list_positions(self):
+        return [SimpleNamespace(symbol=symbol, qty=str(qty)) for symbol, qty in self.positions.items() if qty]
+
+    def get_account(self):
+        equity = self.cash + sum(qty * self._last(symbol)["c"] for symbol, qty in self.positions.items())
+        return SimpleNamespace(cash=str(self.cash), equity=str(equity), buying_power=str(max(self.cash, 0.0)))
+
+    def get_order(self, order_id):
+        return self.orders[int(order_id) - 1]
+
+    def submit_order(self, symbol, qty, side, type="market", time_in_force="gtc", **kwargs):
+        qty = int(qty)
+        price = self._last(symbol)["c"]
+        signed = qty if side == "buy" else -qty
+        self.positions[symbol] = self.positions.get(symbol, 0) + signed
+        self.cash -= signed * price
+        order = SimpleNamespace(id=str(len(self.orders) + 1), symbol=symbol, qty=str(qty), side=side,
+                                filled_avg_price=price, status="filled", t=self._last(symbol)["t"])
+        self.orders.append(order)
+        return order
+
+def replay(strategy, bars, symbol, dollar_amount, cash=100000.0, **strategy_kwargs):
+    """Step a strategy's real `on_bar` bar by bar against a `StubAPI`.
+
+    Much slower than `backtest`; meant for checking a strategy end to end.
+    Returns the stub so its orders and positions can be inspected.
+    """
+    # The live trading modules are only needed here; sweep imports this module in every worker.
+    import bar_cache
+    import execution
+    import portfolio
+    from strategies import base
+
+    api = StubAPI({symbol: bars}, cash=cash)
+    instance = base.create(strategy, api, symbol, dollar_amount, strategy_kwargs)
+    gateway = execution.gateway_for(api, max_workers=0)  # place orders inline, in bar order
+
+    def on_fill(_symbol, order, owner):
+        if owner is instance:
+            instance.on_fill(order)
+
+    gateway.add_fill_listener(on_fill)
+    saved_cache = bar_cache.shared_cache
+    bar_cache.shared_cache = bar_cache.BarCache(min_refresh=0)
+    try:
+        for i in range(len(bars)):
+            api.advance(symbol, i)
+            portfolio.snapshot_for(api).begin_tick([symbol])
+            instance.tick()
+    finally:
+        bar_cache.shared_cache = saved_cache
+    return api
+
+# === Command Line ===
+
+def _parse_param(text):
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Backtest a strategy on local OHLCV bars.")
+    parser.add_argument("path", help="CSV or Parquet file with t/o/h/l/c/v columns, or a bar store series directory")
+    parser.add_argument("--strategy", required=True, choices=sorted(signals.SIGNALS))
+    parser.add_argument("--dollar-amount", type=float, default=1000.0)
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--commission", type=float, default=0.0)
+    parser.add_argument("--param", action="append", default=[], type=_parse_param,
+                        help="strategy keyword argument, e.g. --param window=14")
+    args = parser.parse_args()
+
+    result = backtest(load_bars(args.path), args.strategy, args.dollar_amount,
+                      slippage_bps=args.slippage_bps, commission=args.commission, **dict(args.param))
+    print(json.dumps(result.summary, indent=4))
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+
+import bars
+import metrics
+
+# === Bar Cache ===
+
+def fetch_raw_bars(api, symbol, timeframe, **params):
+    """Fetch bars as raw dicts, skipping the per-bar entity objects when the client allows."""
+    with metrics.span("fetch"):
+        if hasattr(api, "get_bars_iter"):
+            return list(api.get_bars_iter(symbol, timeframe, raw=True, **params))
+        return [bar._raw for bar in api.get_bars(symbol, timeframe, **params)]
+
+def decode(raw_bars):
+    """`bars.decode`, timed as the "decode" stage."""
+    with metrics.span("decode"):
+        return bars.decode(raw_bars)
+
+class _Series:
+    """Columnar ring buffer of bars for one (symbol, timeframe) pair."""
+
+    def __init__(self, capacity):
+        self.buffer = bars.BarBuffer(capacity)
+        self.lock = threading.Lock()
+        self.last_fetch = 0.0
+
+    @property
+    def capacity(self):
+        return self.buffer.capacity
+
+class BarCache:
+    """Shares bar history between strategies and ticks.
+
+    The first request for a (symbol, timeframe) pair backfills `limit` bars.
+    Later requests only ask the API for bars starting at the last cached
+    timestamp: the last cached bar is replaced (it may have still been
+    forming) and newer bars are appended to the ring buffer. Requests made
+    within `min_refresh` seconds of the previous fetch, e.g. several
+    strategies trading the same symbol on the same tick, are served from
+    memory without touching the API.
+
+    With a `store.BarStore` attached, every fetched bar is also written to
+    disk and backfills start from the stored history, so after a restart
+    only the bars missed while the bot was down are downloaded. Stored
+    history is never discarded: if the store is too short or too old to
+    backfill from, the downloaded window is appended after it, gap and all.
+    """
+
+    def __init__(self, min_refresh=1.0, store=None):
+        self.min_refresh = min_refresh
+        self.store = store
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _get_series(self, symbol, timeframe, limit):
+        key = (symbol, str(timeframe))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None or series.capacity < limit:
+                series = _Series(max(limit, series.capacity if series else 0))
+                self._series[key] = series
+            return series
+
+    def get_bars(self, api, symbol, timeframe, limit):
+        """Return the most recent `limit` bars as a `bars.BarView`, fetching only what is new.
+
+        The view is a private copy, so it stays valid while other threads
+        keep updating the cache.
+        """
+        series = self._get_series(symbol, timeframe, limit)
+        with series.lock:
+            now = time.monotonic()
+            if not len(series.buffer):
+                self._backfill(series, api, symbol, timeframe)
+            elif now - series.last_fetch >= self.min_refresh:
+                self._refresh(series, api, symbol, timeframe)
+            series.last_fetch = now
+            return series.buffer.view(limit).copy()
+
+    def _backfill(self, series, api, symbol, timeframe):
+        if self.store is not None:
+            stored = self.store.read(symbol, timeframe, limit=series.capacity)
+            if len(stored) == series.capacity:
+                series.buffer.extend(stored)
+                self._refresh(series, api, symbol, timeframe)
+                logging.debug(f"Backfilled {len(series.buffer)} {timeframe} bars for {symbol} from the store.")
+                return
+        fetched = decode(fetch_raw_bars(api, symbol, timeframe, limit=series.capacity))
+        series.buffer.extend(fetched)
+        if self.store is not None and len(fetched):
+            last_stored = self.store.last_time(symbol, timeframe)
+            if last_stored is not None and fetched.t[0] > last_stored:
+                logging.info(f"Stored {timeframe} bars for {symbol} end at {bars.format_time(last_stored)}; "
+                             f"keeping them and appending after the gap.")
+            self.store.append(symbol, timeframe, fetched)
+        logging.debug(f"Backfilled {len(series.buffer)} {timeframe} bars for {symbol}.")
+
+    def _refresh(self, series, api, symbol, timeframe):
+        start = bars.format_time(series.buffer.last_time)
+        fetched = decode(fetch_raw_bars(api, symbol, timeframe, start=start))
+        series.buffer.extend(fetched)
+        if self.store is not None:
+            self.store.append(symbol, timeframe, fetched)
+
+    def push(self, symbol, timeframe, view):
+        """Merge bars received from a stream into an already backfilled series.
+
+        The series counts as freshly fetched afterwards, so strategies
+        triggered by the bar read it from memory. Returns False if the pair
+        has not been backfilled yet.
+        """
+        with self._lock:
+            series = self._series.get((symbol, str(timeframe)))
+        if series is None:
+            return False
+        with series.lock:
+            if not len(series.buffer):
+                return False
+            series.buffer.extend(view)
+            series.last_fetch = time.monotonic()
+            if self.store is not None:
+                self.store.append(symbol, timeframe, view)
+        return True
+
+    def clear(self, symbol=None):
+        """Drop cached bars for one symbol, or for every symbol."""
+        with self._lock:
+            for key in list(self._series):
+                if symbol is None or key[0] == symbol:
+                    del self._series[key]
+
+shared_cache = BarCache()
+
+def get_bars(api, symbol, timeframe, limit):
+    """Fetch bars through the process-wide cache."""
+    return shared_cache.get_bars(api, symbol, timeframe, limit)
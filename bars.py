@@ -0,0 +1,133 @@
+import numpy as np
+
+# === Columnar Bars ===
+#
+# Bars are kept as parallel NumPy columns instead of one dict (and one
+# DataFrame row) per bar: float64 open/high/low/close/volume and int64
+# timestamps in nanoseconds since the epoch (UTC).
+
+FIELDS = ("o", "h", "l", "c", "v")
+
+def parse_times(stamps):
+    """Parse RFC 3339 UTC strings ("2024-01-02T14:30:00Z") into int64 epoch nanoseconds."""
+    try:
+        return np.array([s[:-1] if s.endswith("Z") else s for s in stamps],
+                        dtype="datetime64[ns]").view(np.int64)
+    except ValueError:
+        # Offsets other than Z; rare enough to leave to pandas.
+        import pandas as pd
+
+        return pd.to_datetime(list(stamps), utc=True).as_unit("ns").asi8.copy()
+
+def to_epoch_ns(stamp):
+    """Convert one timestamp (string, datetime-like or epoch ns) to int64 epoch nanoseconds."""
+    if isinstance(stamp, (int, np.integer)):
+        return int(stamp)
+    if isinstance(stamp, str):
+        return int(parse_times([stamp])[0])
+    import pandas as pd
+
+    stamp = pd.Timestamp(stamp)
+    stamp = stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp.tz_convert("UTC")
+    return stamp.value
+
+def format_time(epoch_ns):
+    """Format epoch nanoseconds the way Alpaca does, e.g. for a `start=` parameter."""
+    return np.datetime_as_string(np.datetime64(int(epoch_ns), "ns"), unit="s") + "Z"
+
+class BarView:
+    """Read-only columnar window over bars; every column is a NumPy array slice."""
+
+    __slots__ = ("t",) + FIELDS
+
+    def __init__(self, t, o, h, l, c, v):
+        self.t, self.o, self.h, self.l, self.c, self.v = t, o, h, l, c, v
+
+    def __len__(self):
+        return len(self.t)
+
+    def copy(self):
+        return BarView(*(getattr(self, name).copy() for name in self.__slots__))
+
+    def tail(self, n):
+        return BarView(*(getattr(self, name)[-n:] for name in self.__slots__))
+
+    def to_frame(self):
+        """Build a pandas frame indexed by UTC time, for code that still wants one."""
+        import pandas as pd
+
+        index = pd.to_datetime(self.t, unit="ns", utc=True)
+        return pd.DataFrame({name: getattr(self, name) for name in FIELDS}, index=index)
+
+def decode(raw_bars):
+    """Decode raw bar dicts (as yielded by `get_bars_iter(..., raw=True)`) into a `BarView`."""
+    n = len(raw_bars)
+    t = parse_times([bar["t"] for bar in raw_bars]) if n else np.empty(0, np.int64)
+    columns = [np.fromiter((bar[name] for bar in raw_bars), np.float64, count=n) for name in FIELDS]
+    return BarView(t, *columns)
+
+class BarBuffer:
+    """Fixed-capacity ring of bars stored in preallocated columns.
+
+    Storage is twice the capacity; when it fills up, the newest `capacity`
+    bars are moved to the front. Appends are amortized O(1) and `view()`
+    always returns contiguous zero-copy slices.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        size = 2 * self.capacity
+        self._t = np.empty(size, np.int64)
+        self._cols = {name: np.empty(size, np.float64) for name in FIELDS}
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def last_time(self):
+        return int(self._t[self._end - 1]) if self._end > self._start else None
+
+    def _make_room(self, count):
+        if self._end + count <= len(self._t):
+            return
+        keep = min(len(self), self.capacity - min(count, self.capacity))
+        src = slice(self._end - keep, self._end)
+        self._t[:keep] = self._t[src]
+        for col in self._cols.values():
+            col[:keep] = col[src]
+        self._start, self._end = 0, keep
+
+    def extend(self, view):
+        """Merge bars from a `BarView`: a bar with the latest stored timestamp replaces
+        it, newer bars are appended and older ones are ignored."""
+        if not len(view):
+            return
+        last = self.last_time
+        first_new = 0
+        if last is not None:
+            first_new = int(np.searchsorted(view.t, last, side="left"))
+            if first_new < len(view) and view.t[first_new] == last:
+                for name, col in self._cols.items():
+                    col[self._end - 1] = getattr(view, name)[first_new]
+                first_new += 1
+        count = len(view) - first_new
+        if count <= 0:
+            return
+        if count > self.capacity:
+            first_new += count - self.capacity
+            count = self.capacity
+        self._make_room(count)
+        dst = slice(self._end, self._end + count)
+        self._t[dst] = view.t[first_new:]
+        for name, col in self._cols.items():
+            col[dst] = getattr(view, name)[first_new:]
+        self._end += count
+        self._start = max(self._start, self._end - self.capacity)
+
+    def view(self, limit=None):
+        """Return the newest `limit` bars (all by default) without copying."""
+        start = self._start if limit is None else max(self._start, self._end - int(limit))
+        window = slice(start, self._end)
+        return BarView(self._t[window], *(self._cols[name][window] for name in FIELDS))
@@ -0,0 +1,60 @@
+"""Compare per-tick bar handling through pandas frames and through NumPy columns.
+
+Before, every tick turned the whole window into a DataFrame
+(`pd.DataFrame([bar._raw for bar in barset]).set_index('t')`). Now the bar
+cache decodes only the newly fetched bars into a `bars.BarBuffer` and hands
+strategies a `bars.BarView` copy. Also reports one-off decode throughput,
+i.e. the cost of a backfill.
+
+    python benchmarks/bench_bars.py [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import bars
+
+SIZES = [1_000, 10_000, 100_000]
+
+def make_raw(n):
+    times = pd.date_range("2024-01-02 14:30", periods=n, freq="min", tz="UTC").strftime("%Y-%m-%dT%H:%M:%SZ")
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, n))
+    return [{"t": t, "o": c, "h": c + 0.05, "l": c - 0.05, "c": c, "v": 1000.0}
+            for t, c in zip(times, close.tolist())]
+
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs)
+
+def tick_frame(raw, window):
+    df = pd.DataFrame(raw[-window:]).set_index("t")
+    return df["c"].iloc[-1]
+
+def tick_columns(buffer, new_bar, window):
+    buffer.extend(bars.decode([new_bar]))
+    return buffer.view(window).copy().c[-1]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for n in SIZES:
+        raw = make_raw(n + 1)
+        history, new_bar = raw[:-1], raw[-1]
+        buffer = bars.BarBuffer(n)
+        buffer.extend(bars.decode(history))
+        frame = timed(lambda: tick_frame(raw, n), args.repeat)
+        columns = timed(lambda: tick_columns(buffer, new_bar, n), args.repeat)
+        backfill = timed(lambda: bars.decode(history), args.repeat)
+        print(f"{n:>7}-bar window  per tick: pandas {frame * 1000:8.3f} ms  numpy {columns * 1000:8.3f} ms"
+              f"  ({frame / columns:.0f}x)   backfill decode {backfill * 1000:7.2f} ms")
@@ -0,0 +1,40 @@
+"""Time scoring a whole universe with one (symbols x bars) matrix against a per-symbol loop.
+
+    python benchmarks/bench_signals.py [--symbols 3000] [--bars 500] [--repeat 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import signals
+
+CASES = [
+    ("moving_average", {"short_window": 10, "long_window": 30}),
+    ("rsi", {"window": 14}),
+    ("bollinger_bands", {"window": 20, "num_std": 2}),
+]
+
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=3000)
+    parser.add_argument("--bars", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    closes = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, (args.symbols, args.bars)), axis=1)
+    for strategy, kwargs in CASES:
+        loop = timed(lambda: [signals.compute_signal(strategy, row, **kwargs)[-1] for row in closes], args.repeat)
+        matrix = timed(lambda: signals.latest_signals(strategy, closes, **kwargs), args.repeat)
+        print(f"{strategy:16} per-symbol {loop * 1000:9.1f} ms  matrix {matrix * 1000:7.1f} ms  ({loop / matrix:.0f}x)")
@@ -0,0 +1,48 @@
+"""Measure how long it takes to start the bot with each strategy.
+
+Each measurement runs in a fresh interpreter and imports TradingBot plus one
+strategy module, which is everything that happens before the first tick.
+Also reports whether torch/transformers were pulled in at import time; only
+the sentiment strategy should ever load them, and only on first use.
+
+    python benchmarks/bench_startup.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STRATEGIES = ["moving_average", "rsi", "bollinger_bands", "skLearn", "sentiment"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import TradingBot
+import strategies.{strategy}
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in ("torch", "transformers", "sklearn") if m in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy}}))
+"""
+
+def measure(strategy, repeat):
+    runs = []
+    for _ in range(repeat):
+        started = subprocess.run([sys.executable, "-c", PROBE.format(strategy=strategy)],
+                                 cwd=ROOT, capture_output=True, text=True)
+        if started.returncode != 0:
+            return {"error": started.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(started.stdout.strip().splitlines()[-1]))
+    return {
+        "median_seconds": round(statistics.median(r["seconds"] for r in runs), 3),
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for strategy in STRATEGIES:
+        print(f"{strategy:16} {json.dumps(measure(strategy, args.repeat))}")
@@ -0,0 +1,169 @@
+"""Benchmark every strategy against a simulated Alpaca API at 1, 100 and 1,000 symbols.
+
+For each strategy and universe size, one instance per symbol is created and
+the whole universe is ticked `--ticks` times, one new minute bar per tick,
+the way the scheduler would. Reported per case:
+
+    ticks_per_second   symbol-ticks completed per wall-clock second
+    p50_ms / p99_ms    latency of a single symbol's tick
+    requests_per_tick  fake REST calls per symbol-tick
+    peak_mb            peak Python allocations (tracemalloc) of creating the
+                       strategies and running two ticks, bar cache included
+
+Results are written to benchmarks/results/strategies-<git revision>.json;
+pass `--compare` with an earlier file to see the change per case.
+
+    python benchmarks/bench_strategies.py [--symbols 1,100,1000] [--ticks 20] [--latency 0.0]
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+import bar_cache
+import execution
+import portfolio
+from fake_alpaca import FakeREST
+from strategies import base
+
+RESULTS_DIR = os.path.join(HERE, "results")
+WARMUP_BARS = 120
+
+# Strategies whose model dependencies are optional.
+REQUIRES = {"sentiment": "transformers"}
+
+STRATEGY_KWARGS = {
+    "moving_average": {"short_window": 10, "long_window": 30, "timeframe": "1Min"},
+    "rsi": {"timeframe": "1Min"},
+    "bollinger_bands": {"timeframe": "1Min"},
+    "skLearn": {"timeframe": "1Min"},
+    "sentiment": {},
+}
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+def make_api(n_symbols, ticks, latency):
+    symbols = [f"SYM{i:04d}" for i in range(n_symbols)]
+    api = FakeREST(symbols, n_bars=WARMUP_BARS + ticks + 1, latency=latency)
+    execution.gateway_for(api, max_workers=0)
+    bar_cache.shared_cache = bar_cache.BarCache(min_refresh=0)
+    return api
+
+def make_instances(strategy, api):
+    return [base.create(strategy, api, symbol, 1000.0, STRATEGY_KWARGS.get(strategy)) for symbol in api.symbols]
+
+def run_tick(api, instances, index, pool=None):
+    api.advance_all(index)
+    portfolio.snapshot_for(api).begin_tick(api.symbols)
+    prepare = getattr(type(instances[0]), "prepare", None)
+    if prepare is not None:
+        prepare(api.symbols, api)
+
+    def timed(instance):
+        start = time.perf_counter()
+        instance.tick()
+        return time.perf_counter() - start
+
+    if pool is None:
+        return [timed(instance) for instance in instances]
+    return list(pool.map(timed, instances))
+
+def measure(strategy, n_symbols, ticks, latency, workers):
+    api = make_api(n_symbols, ticks, latency)
+    instances = make_instances(strategy, api)
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        run_tick(api, instances, WARMUP_BARS, pool)  # backfill, not counted
+        api.calls.clear()
+        latencies = []
+        start = time.perf_counter()
+        for i in range(1, ticks + 1):
+            latencies.extend(run_tick(api, instances, WARMUP_BARS + i, pool))
+        elapsed = time.perf_counter() - start
+        requests = sum(api.calls.values())
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    latencies.sort()
+    symbol_ticks = len(latencies)
+
+    api = make_api(n_symbols, ticks, 0.0)
+    tracemalloc.start()
+    instances = make_instances(strategy, api)
+    for i in range(2):
+        run_tick(api, instances, WARMUP_BARS + i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "strategy": strategy,
+        "symbols": n_symbols,
+        "ticks_per_second": round(symbol_ticks / elapsed, 1),
+        "p50_ms": round(1000 * statistics.median(latencies), 4),
+        "p99_ms": round(1000 * latencies[min(symbol_ticks - 1, int(0.99 * symbol_ticks))], 4),
+        "requests_per_tick": round(requests / symbol_ticks, 3),
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+def compare(results, previous_path):
+    with open(previous_path) as f:
+        previous = {(r["strategy"], r["symbols"]): r for r in json.load(f)["results"]}
+    for r in results:
+        old = previous.get((r["strategy"], r["symbols"]))
+        if old:
+            change = r["ticks_per_second"] / old["ticks_per_second"] - 1
+            print(f"{r['strategy']:16} {r['symbols']:>5} symbols  ticks/s {change:+.1%}  "
+                  f"p99 {old['p99_ms']:.3f} -> {r['p99_ms']:.3f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strategies", default=",".join(STRATEGY_KWARGS))
+    parser.add_argument("--symbols", default="1,100,1000")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fake REST call")
+    parser.add_argument("--workers", type=int, default=1, help="threads ticking symbols in parallel")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    registered = base.discover()
+    results = []
+    for strategy in args.strategies.split(","):
+        if strategy not in registered or (strategy in REQUIRES and importlib.util.find_spec(REQUIRES[strategy]) is None):
+            print(f"{strategy:16} not available, skipped")
+            continue
+        for n in (int(x) for x in args.symbols.split(",")):
+            result = measure(strategy, n, args.ticks, args.latency, args.workers)
+            results.append(result)
+            print(json.dumps(result))
+
+    revision = git_revision()
+    output = args.output or os.path.join(RESULTS_DIR, f"strategies-{revision}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "revision": revision, "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "machine": platform.machine(),
+            "ticks": args.ticks, "latency": args.latency, "workers": args.workers,
+            "results": results,
+        }, f, indent=2)
+    print(f"Saved {output}")
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,87 @@
+"""Deterministic in-process fake of the Alpaca REST calls the strategies make.
+
+Every symbol gets a seeded random walk of minute bars. `advance_all(i)` makes
+bar `i` the latest one for every symbol, orders fill immediately at that
+bar's close, and each call can be made to take `latency` seconds to mimic
+the network round trip. Request counts per method are kept in `calls`.
+Calls are safe from several threads: the latency is slept concurrently,
+while cash, positions, orders and counters change under one lock.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backtest import StubAPI
+
+def random_walk_bars(n_bars, seed, start="2024-01-02 14:30"):
+    """One symbol's OHLCV frame, identical for the same seed."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n_bars)))
+    spread = close * 0.001
+    return pd.DataFrame({
+        "o": np.roll(close, 1), "h": close + spread, "l": close - spread, "c": close,
+        "v": rng.integers(100, 10000, n_bars).astype(float),
+    }, index=pd.date_range(start, periods=n_bars, freq="min", tz="UTC"))
+
+class FakeREST(StubAPI):
+    """`StubAPI` over generated bars for `symbols`, with optional per-call latency."""
+
+    def __init__(self, symbols, n_bars=300, latency=0.0, cash=1e9, seed=0):
+        super().__init__({s: random_walk_bars(n_bars, seed + i) for i, s in enumerate(symbols)}, cash=cash)
+        self.symbols = list(symbols)
+        self.n_bars = n_bars
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _request(self, name):
+        with self._lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def advance_all(self, index):
+        with self._lock:
+            for symbol in self.symbols:
+                self.advance(symbol, index)
+
+    def get_bars_iter(self, symbol, timeframe, start=None, limit=None, raw=False, **kwargs):
+        self._request("get_bars")
+        with self._lock:
+            return iter(list(super().get_bars_iter(symbol, timeframe, start=start, limit=limit, raw=raw, **kwargs)))
+
+    def get_latest_trade(self, symbol):
+        self._request("get_latest_trade")
+        with self._lock:
+            return super().get_latest_trade(symbol)
+
+    def get_latest_trades(self, symbols):
+        self._request("get_latest_trades")
+        with self._lock:
+            return {symbol: StubAPI.get_latest_trade(self, symbol) for symbol in symbols}
+
+    def list_positions(self):
+        self._request("list_positions")
+        with self._lock:
+            return super().list_positions()
+
+    def get_account(self):
+        self._request("get_account")
+        with self._lock:
+            return super().get_account()
+
+    def get_order(self, order_id):
+        self._request("get_order")
+        with self._lock:
+            return super().get_order(order_id)
+
+    def submit_order(self, symbol, qty, side, type="market", time_in_force="gtc", **kwargs):
+        self._request("submit_order")
+        with self._lock:
+            return super().submit_order(symbol, qty, side, type=type, time_in_force=time_in_force, **kwargs)
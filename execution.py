@@ -0,0 +1,337 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import metrics
+import portfolio
+
+# === Execution Gateway ===
+
+TERMINAL_STATUSES = ("filled", "canceled", "expired", "rejected", "done_for_day")
+RECONCILE_INTERVAL = 30.0  # seconds between polls of open orders while trade updates are streamed
+
+class _OrderState:
+    def __init__(self, order_id):
+        self.order_id = order_id
+        self.symbol = None
+        self.order = None
+        self.owner = None
+        self.submitted = False  # placed by this gateway (not just seen on the stream)
+        self.notified = False
+        self.callbacks = []  # run once the order is final, see ExecutionGateway._when_done
+        self.status = "new"
+        self.done = threading.Event()
+
+    def update(self, status, order=None):
+        """Record a status (and the order as reported with it); returns True the first time it is seen filled."""
+        if self.done.is_set() and status not in TERMINAL_STATUSES:
+            return False  # a late submit response must not undo a streamed fill
+        if order is not None:
+            self.order = order
+        newly_filled = status == "filled" and self.status != "filled"
+        self.status = status
+        if status in TERMINAL_STATUSES:
+            self.done.set()
+        return newly_filled
+
+def pool_connections(api, size):
+    """Let the API client's requests session keep `size` connections per host alive."""
+    session = getattr(api, "_session", None)
+    if session is None:
+        return
+    from requests.adapters import HTTPAdapter
+
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+class ExecutionGateway:
+    """Submits market orders off the strategy threads and tracks them to completion.
+
+    `set_direction` returns immediately with a Future; the order work runs on
+    a small pool so a slow submission never holds up other symbols. Moving
+    from long to short (or back) is sent as one netted order for the full
+    difference. If the broker refuses or later rejects a netted order, the
+    gateway falls back to closing first and opening once the close has
+    filled; no worker ever waits for a fill, each step is started by the
+    status update that allows it. Order status comes from trade update
+    events once `attach` has been called, otherwise from polling the
+    orders still open every `poll_interval` seconds. While streaming,
+    open orders are still polled every `RECONCILE_INTERVAL` seconds in
+    case an update was missed. With `max_workers=0` orders are placed
+    inline, which backtest replays rely on.
+    """
+
+    def __init__(self, api, max_workers=4, net_flips=True, poll_interval=1.0):
+        self.api = api
+        self.net_flips = net_flips
+        self.poll_interval = poll_interval
+        self.streaming = False
+        self._orders = {}
+        self._open = {}
+        self._poller = None
+        self._pending = set()
+        self._fill_listeners = []
+        self._lock = threading.Lock()
+        self._executor = None
+        if max_workers:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="orders")
+            pool_connections(api, max_workers * 2)
+
+    # --- Order state ---
+
+    def _state(self, order_id):
+        with self._lock:
+            state = self._orders.get(order_id)
+            if state is None:
+                if len(self._orders) >= 10000:
+                    self._orders = {k: v for k, v in self._orders.items() if not v.done.is_set()}
+                state = self._orders[order_id] = _OrderState(order_id)
+            return state
+
+    def add_fill_listener(self, listener):
+        """Call `listener(symbol, order, owner)` once for every order placed by this gateway that fills.
+
+        `owner` is what was passed to `set_direction` (the strategy that
+        asked for the order), or None.
+        """
+        self._fill_listeners.append(listener)
+
+    def _update(self, state, status, order=None):
+        state.update(status, order)
+        callbacks = ()
+        with self._lock:
+            notify = state.submitted and state.status == "filled" and not state.notified
+            state.notified = state.notified or notify
+            if state.done.is_set():
+                self._open.pop(state.order_id, None)
+                callbacks, state.callbacks = state.callbacks, []
+        if notify:
+            for listener in self._fill_listeners:
+                try:
+                    listener(state.symbol, state.order, state.owner)
+                except Exception as e:
+                    logging.error(f"Error in fill listener for {state.symbol}: {e}")
+        for callback in callbacks:
+            self._run_callback(state, callback)
+
+    def _when_done(self, state, callback, *args):
+        """Call `callback(state, *args)` once the order is final: now if it already is, else from `_update`."""
+        with self._lock:
+            if not state.done.is_set():
+                state.callbacks.append((callback, args))
+                return
+        self._run_callback(state, (callback, args))
+
+    def _run_callback(self, state, entry):
+        callback, args = entry
+        try:
+            callback(state, *args)
+        except Exception as e:
+            logging.error(f"Error following up order {state.order_id}: {e}")
+
+    # --- Polling open orders ---
+
+    def _track(self, state):
+        """Poll `state` until it is final (rarely, as a safety net, while trade updates are streamed)."""
+        with self._lock:
+            if state.done.is_set():
+                return
+            self._open[state.order_id] = state
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_open_orders, name="order-poll", daemon=True)
+                self._poller.start()
+
+    def _poll_open_orders(self):
+        while True:
+            time.sleep(max(self.poll_interval, RECONCILE_INTERVAL) if self.streaming else self.poll_interval)
+            with self._lock:
+                states = list(self._open.values())
+                if not states:
+                    self._poller = None
+                    return
+            try:
+                self.poll(states)
+            except Exception as e:
+                logging.error(f"Error polling open orders: {e}")
+
+    def poll(self, states=None):
+        """Refresh the status of open orders: one `list_orders` call, then `get_order` for those that closed."""
+        if states is None:
+            with self._lock:
+                states = list(self._open.values())
+        if not states:
+            return
+        still_open = None
+        if hasattr(self.api, "list_orders"):
+            still_open = {order.id: order for order in self.api.list_orders(status="open", limit=500)}
+        for state in states:
+            if still_open is not None and state.order_id in still_open:
+                order = still_open[state.order_id]
+            else:
+                order = self.api.get_order(state.order_id)
+            self._update(state, order.status, order)
+
+    def on_trade_update(self, data):
+        """Record the new status of an order from a trade update event."""
+        order = data.order
+        status = order.get("status") or data.event
+        state = self._state(order["id"])
+        state.symbol = state.symbol or order.get("symbol")
+        self._update(state, status, order)
+
+    def attach(self, stream):
+        """Subscribe to trade updates; fills also update the shared portfolio snapshot."""
+        snapshot = portfolio.snapshot_for(self.api)
+
+        async def handle(data):
+            try:
+                self.on_trade_update(data)
+                snapshot.on_trade_update(data)
+            except Exception as e:
+                logging.error(f"Error applying trade update: {e}")
+
+        stream.subscribe_trade_updates(handle)
+        self.streaming = snapshot.streaming = True
+
+    # --- Orders ---
+
+    def _submit(self, symbol, qty, side, owner=None):
+        with metrics.span("submit"):
+            order = self.api.submit_order(symbol=symbol, qty=qty, side=side, type='market', time_in_force='gtc')
+        state = self._state(order.id)
+        state.symbol, state.owner = symbol, owner
+        state.submitted = True
+        # A streamed update may already have finished the order; that status wins.
+        self._update(state, getattr(order, "status", None) or state.status, order)
+        self._track(state)
+        return order
+
+    def _finish(self, symbol, future, order=None, error=None):
+        with self._lock:
+            self._pending.discard(symbol)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(order)
+
+    def _continue(self, symbol, future, step, *args):
+        """Run the next step of an order sequence on the pool, never on the stream or polling thread."""
+        if self._executor is None:
+            step(*args)
+            return
+        try:
+            self._executor.submit(step, *args)
+        except RuntimeError as e:  # shut down
+            self._finish(symbol, future, error=e)
+
+    def _move(self, symbol, current, target, owner, future):
+        delta = target - current
+        side = 'buy' if delta > 0 else 'sell'
+        try:
+            if current * target >= 0:
+                self._finish(symbol, future, self._submit(symbol, abs(delta), side, owner))
+                return
+            if self.net_flips:
+                try:
+                    order = self._submit(symbol, abs(delta), side, owner)
+                except Exception as e:
+                    logging.info(f"Netted flip for {symbol} refused ({e}); closing first.")
+                else:
+                    self._when_done(self._state(order.id), self._after_netted_flip,
+                                    symbol, current, target, side, owner, future)
+                    return
+            self._close_then_open(symbol, current, target, side, owner, future)
+        except Exception as e:
+            logging.error(f"Order for {symbol} failed: {e}")
+            self._finish(symbol, future, error=e)
+
+    def _after_netted_flip(self, state, symbol, current, target, side, owner, future):
+        if state.status == "rejected":
+            logging.info(f"Netted flip for {symbol} rejected; closing first.")
+            self._continue(symbol, future, self._close_then_open, symbol, current, target, side, owner, future)
+        else:
+            self._finish(symbol, future, state.order)
+
+    def _close_then_open(self, symbol, current, target, side, owner, future):
+        try:
+            close = self._submit(symbol, abs(current), side, owner)
+        except Exception as e:
+            logging.error(f"Close order for {symbol} failed: {e}")
+            self._finish(symbol, future, error=e)
+            return
+        self._when_done(self._state(close.id), self._open_after_close, symbol, target, side, owner, future)
+
+    def _open_after_close(self, state, symbol, target, side, owner, future):
+        if state.status != "filled":
+            logging.error(f"Close order for {symbol} ended {state.status}; not opening the new position.")
+            self._finish(symbol, future, state.order)
+            return
+
+        def open_position():
+            try:
+                self._finish(symbol, future, self._submit(symbol, abs(target), side, owner))
+            except Exception as e:
+                logging.error(f"Order for {symbol} failed: {e}")
+                self._finish(symbol, future, error=e)
+
+        self._continue(symbol, future, open_position)
+
+    def set_direction(self, symbol, direction, quantity, current_position=None, owner=None):
+        """Hold a long or short position of `quantity` shares in `symbol`.
+
+        Does nothing if already positioned in that direction or if an earlier
+        order for the symbol is still being worked. A `quantity` of 0 still
+        closes a position on the other side. Returns a Future for the
+        final order, or None if nothing was sent. A flip counts as worked
+        until its netted order is final, since a rejection arriving later
+        starts the close-then-open fallback. Fills of the orders are
+        reported to the fill listeners with `owner`.
+        """
+        current = int(current_position.qty) if current_position else 0
+        sign = 1 if direction == "long" else -1
+        target = sign * quantity
+        if current * sign > 0:
+            logging.info(f"Already in {direction} position for {symbol}. No action taken.")
+            return None
+        if target == 0 and current == 0:
+            logging.info(f"Order size for {symbol} is 0. No action taken.")
+            return None
+        with self._lock:
+            if symbol in self._pending:
+                logging.info(f"Order for {symbol} still in flight. No action taken.")
+                return None
+            self._pending.add(symbol)
+        if target == 0:
+            logging.info(f"Order size for {symbol} is 0. Closing the {current} share position...")
+        elif current:
+            logging.info(f"Flipping {symbol} from {current} to {target} shares...")
+        else:
+            logging.info(f"No current position for {symbol}. Opening {direction} position...")
+        future = Future()
+        if self._executor is None:
+            self._move(symbol, current, target, owner, future)
+            return future
+        try:
+            self._executor.submit(self._move, symbol, current, target, owner, future)
+        except RuntimeError:
+            with self._lock:
+                self._pending.discard(symbol)
+            raise
+        return future
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+_gateways = {}
+_gateways_lock = threading.Lock()
+
+def gateway_for(api, **options):
+    """Return the process-wide gateway for an API client, creating it with `options` on first use."""
+    with _gateways_lock:
+        gateway = _gateways.get(id(api))
+        if gateway is None or gateway.api is not api:
+            gateway = _gateways[id(api)] = ExecutionGateway(api, **options)
+        return gateway
@@ -0,0 +1,239 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+import metrics
+
+# === Streaming Indicators ===
+#
+# Each indicator consumes one close at a time and updates in O(1). Outputs
+# follow pandas_ta: `value` stays None until `length` observations have been
+# seen. `update(x, replace=True)` revises the most recent observation instead
+# of appending one, which is how a still-forming bar is refreshed between
+# ticks.
+
+class SMA:
+    """Simple moving average from a rolling sum (matches `ta.sma`)."""
+
+    def __init__(self, length):
+        self.length = int(length)
+        self._window = deque()
+        self._sum = 0.0
+        self._since_resync = 0
+        self.value = None
+        self.previous = None
+
+    def update(self, value, replace=False):
+        value = float(value)
+        if replace and self._window:
+            self._sum += value - self._window[-1]
+            self._window[-1] = value
+        else:
+            self.previous = self.value
+            self._window.append(value)
+            self._sum += value
+            if len(self._window) > self.length:
+                self._sum -= self._window.popleft()
+            self._since_resync += 1
+            if self._since_resync >= self.length:
+                # Re-add from scratch once per window to stop float drift.
+                self._sum = math.fsum(self._window)
+                self._since_resync = 0
+        self.value = self._sum / self.length if len(self._window) == self.length else None
+        return self.value
+
+class RSI:
+    """Relative strength index with Wilder smoothing (matches `ta.rsi`).
+
+    pandas_ta smooths gains and losses with `ewm(alpha=1/length)`, i.e. an
+    adjusted exponential mean. Both means share the same normalising weight,
+    which cancels in the ratio, so only the decayed sums are kept.
+    """
+
+    def __init__(self, length):
+        self.length = int(length)
+        self._decay = 1.0 - 1.0 / self.length
+        # (previous close, decayed gain sum, decayed loss sum, number of changes seen)
+        self._state = (None, 0.0, 0.0, 0)
+        self._before_last = None
+        self.value = None
+        self.previous = None
+
+    def _step(self, state, value):
+        prev_close, gains, losses, count = state
+        if prev_close is None:
+            return (value, gains, losses, count)
+        change = value - prev_close
+        return (
+            value,
+            max(change, 0.0) + self._decay * gains,
+            max(-change, 0.0) + self._decay * losses,
+            count + 1,
+        )
+
+    def update(self, value, replace=False):
+        value = float(value)
+        if not (replace and self._before_last is not None):
+            self._before_last = self._state
+            self.previous = self.value
+        self._state = self._step(self._before_last, value)
+        _, gains, losses, count = self._state
+        if count < self.length:
+            self.value = None
+        elif gains + losses == 0:
+            self.value = math.nan
+        else:
+            self.value = 100.0 * gains / (gains + losses)
+        return self.value
+
+class BollingerBands:
+    """Bollinger bands from a sliding Welford mean/variance (matches `ta.bbands`).
+
+    Like pandas_ta the band width uses the population standard deviation.
+    """
+
+    def __init__(self, length, num_std=2):
+        self.length = int(length)
+        self.num_std = float(num_std)
+        self._window = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._since_resync = 0
+        self.lower = self.middle = self.upper = None
+
+    def _add(self, value):
+        delta = value - self._mean
+        self._mean += delta / len(self._window)
+        self._m2 += delta * (value - self._mean)
+
+    def _swap(self, old, new):
+        old_mean = self._mean
+        self._mean += (new - old) / len(self._window)
+        self._m2 += (new - old) * (new - self._mean + old - old_mean)
+
+    def _resync(self):
+        self._mean = math.fsum(self._window) / len(self._window)
+        self._m2 = math.fsum((x - self._mean) ** 2 for x in self._window)
+        self._since_resync = 0
+
+    def update(self, value, replace=False):
+        value = float(value)
+        if replace and self._window:
+            old = self._window[-1]
+            self._window[-1] = value
+            self._swap(old, value)
+        else:
+            self._window.append(value)
+            if len(self._window) > self.length:
+                self._swap(self._window.popleft(), value)
+            else:
+                self._add(value)
+            self._since_resync += 1
+            if self._since_resync >= self.length:
+                self._resync()
+        if len(self._window) < self.length:
+            self.lower = self.middle = self.upper = None
+        else:
+            width = self.num_std * math.sqrt(max(self._m2, 0.0) / self.length)
+            self.middle = self._mean
+            self.lower = self._mean - width
+            self.upper = self._mean + width
+        return self.middle
+
+class LinearTrend:
+    """Least-squares line through the last `length` closes, extrapolated one bar ahead.
+
+    Gives the same forecast as fitting `sklearn.linear_model.LinearRegression`
+    on (bar index, close) over the window, but from rolling sums of y and t*y
+    (t = position in the window), so each bar costs O(1) instead of a fit.
+    """
+
+    def __init__(self, length):
+        self.length = int(length)
+        if self.length < 2:
+            raise ValueError("LinearTrend needs a length of at least 2.")
+        self._window = deque()
+        self._sum_y = 0.0
+        self._sum_ty = 0.0
+        self._since_resync = 0
+        t = range(self.length)
+        self._sum_t = float(sum(t))
+        self._denominator = self.length * sum(i * i for i in t) - self._sum_t ** 2
+        self.slope = self.intercept = self.value = None
+
+    def _resync(self):
+        self._sum_y = math.fsum(self._window)
+        self._sum_ty = math.fsum(i * y for i, y in enumerate(self._window))
+        self._since_resync = 0
+
+    def update(self, value, replace=False):
+        value = float(value)
+        if replace and self._window:
+            delta = value - self._window[-1]
+            self._window[-1] = value
+            self._sum_y += delta
+            self._sum_ty += (len(self._window) - 1) * delta
+        else:
+            self._window.append(value)
+            if len(self._window) > self.length:
+                # Every remaining point moves one step back in the window.
+                dropped = self._window.popleft()
+                self._sum_ty += (self.length - 1) * value - (self._sum_y - dropped)
+                self._sum_y += value - dropped
+            else:
+                self._sum_ty += (len(self._window) - 1) * value
+                self._sum_y += value
+            self._since_resync += 1
+            if self._since_resync >= self.length:
+                self._resync()
+        if len(self._window) < self.length:
+            self.slope = self.intercept = self.value = None
+        else:
+            n = self.length
+            self.slope = (n * self._sum_ty - self._sum_t * self._sum_y) / self._denominator
+            self.intercept = (self._sum_y - self.slope * self._sum_t) / n
+            self.value = self.intercept + self.slope * n
+        return self.value
+
+# === Feeding Indicators From Bars ===
+
+class IndicatorFeed:
+    """Feeds bars into a set of indicators, consuming each bar exactly once.
+
+    Strategies keep one feed per symbol between ticks. `update(bars)`
+    accepts the same bar window every tick (e.g. from
+    `bar_cache.get_bars`); only bars newer than the last one seen are
+    pushed, and a bar with the same timestamp as the last one is pushed as
+    a replacement. If the window no longer overlaps what was seen, the
+    indicators are rebuilt from the window.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._last_time = None
+        self.indicators = factory()
+
+    def update(self, view):
+        """Push the new bars of a `bars.BarView` and return the indicators."""
+        with self._lock, metrics.span("compute"):
+            times, closes = view.t, view.c
+            start = 0
+            if self._last_time is not None and len(times):
+                start = int(np.searchsorted(times, self._last_time, side="left"))
+                if start < len(times) and times[start] == self._last_time:
+                    self._push(closes[start], replace=True)
+                    start += 1
+                elif start == 0:
+                    self.indicators = self._factory()  # gap: window moved past what was seen
+            for close in closes[start:]:
+                self._push(close)
+            if len(times) and (self._last_time is None or times[-1] > self._last_time):
+                self._last_time = times[-1]  # never backwards, or later bars would be pushed twice
+            return self.indicators
+
+    def _push(self, close, replace=False):
+        for indicator in self.indicators.values():
+            indicator.update(close, replace=replace)
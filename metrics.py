@@ -0,0 +1,220 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# === Stage Timing ===
+#
+# `span(stage)` times a block of the hot path (fetch, decode, compute,
+# snapshot, submit, ...) into a per-stage latency histogram. Spans nest per
+# thread: a span without labels inherits its parent's (so the bar fetch
+# inside an RSI tick is labelled strategy="rsi"), and a span given
+# `self_name` also records its own time minus its children, which is how a
+# tick's "decide" time is measured. Until `enable()` is called, `span()`
+# returns a shared no-op object and nothing is recorded.
+#
+# "fetch" is the whole bar request as the strategy sees it, including any
+# time spent waiting for a token from `RateLimitedREST`'s bucket; that wait
+# is also recorded on its own as "rate_limit_wait".
+
+# Bucket upper bounds in seconds, 10us to 30s.
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = False
+_local = threading.local()
+
+class Histogram:
+    """Fixed-bucket latency histogram with count, sum and max."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside the bucket that holds it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+class Registry:
+    """Histograms keyed by stage name and labels."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, labels=()):
+        key = (stage, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def summary(self):
+        """Count, mean, p50, p99 and max (in seconds) of every stage."""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            return [
+                dict(stage=stage, **dict(labels), count=h.count, mean=h.sum / h.count,
+                     p50=h.quantile(0.5), p99=h.quantile(0.99), max=h.max)
+                for (stage, labels), h in items
+            ]
+
+    def render_prometheus(self):
+        """Render every histogram in the Prometheus text exposition format."""
+        name = "tradingbot_stage_seconds"
+        lines = [f"# HELP {name} Time spent in each stage of a bot tick.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for (stage, labels), h in sorted(self._histograms.items()):
+                base = ",".join(f'{k}="{v}"' for k, v in (("stage", stage),) + labels)
+                cumulative = 0
+                for bound, n in zip(self.bucket_labels(h), h.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{base}}} {h.sum}")
+                lines.append(f"{name}_count{{{base}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def bucket_labels(histogram):
+        return [repr(b) for b in histogram.buckets] + ["+Inf"]
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+registry = Registry()
+
+class _Span:
+    __slots__ = ("stage", "labels", "self_name", "parent", "children", "start")
+
+    def __init__(self, stage, labels, self_name):
+        self.stage = stage
+        self.labels = labels
+        self.self_name = self_name
+
+    def __enter__(self):
+        self.parent = getattr(_local, "span", None)
+        if not self.labels and self.parent is not None:
+            self.labels = self.parent.labels
+        self.children = 0.0
+        _local.span = self
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _local.span = self.parent
+        if self.parent is not None:
+            self.parent.children += elapsed
+        registry.observe(self.stage, elapsed, self.labels)
+        if self.self_name:
+            registry.observe(self.self_name, elapsed - self.children, self.labels)
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+def span(stage, self_name=None, **labels):
+    """Time a `with` block as `stage`; a no-op while metrics are disabled."""
+    if not _enabled:
+        return _NO_SPAN
+    return _Span(stage, tuple(sorted(labels.items())), self_name)
+
+def observe(stage, seconds, **labels):
+    """Record a duration measured elsewhere, e.g. stream arrival to dispatch."""
+    if _enabled:
+        registry.observe(stage, seconds, tuple(sorted(labels.items())))
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+# === Exporting ===
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = registry.render_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(registry.summary(), indent=2), "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would flood the bot's log
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics (Prometheus) and /metrics.json from a background thread."""
+    enable()
+    server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logging.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+def write_json(path):
+    """Write the stage summary to `path`, replacing the previous dump atomically."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"time": time.time(), "stages": registry.summary()}, f, indent=2)
+    os.replace(tmp, path)
+
+def dump_periodically(path, interval=60.0):
+    """Write the stage summary to `path` every `interval` seconds from a background thread."""
+    enable()
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            try:
+                write_json(path)
+            except Exception as e:
+                logging.error(f"Error writing metrics to {path}: {e}")
+
+    threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
+    return stop
@@ -0,0 +1,62 @@
+import logging
+import os
+import threading
+
+# === Model Registry ===
+#
+# ML models are loaded on first use and shared by every strategy in the
+# process, so bots that never touch a model never import torch/transformers.
+#
+# SENTIMENT_BACKEND selects how CPU inference runs:
+#   torch      plain transformers pipeline (default)
+#   quantized  torch dynamic int8 quantization of the Linear layers
+#   onnx       ONNX Runtime through `optimum` (falls back to torch if missing)
+
+DEFAULT_MODELS = {
+    "sentiment-analysis": "distilbert/distilbert-base-uncased-finetuned-sst-2-english",
+}
+
+_pipelines = {}
+_lock = threading.Lock()
+
+def _load_pipeline(task, model, backend):
+    from transformers import pipeline
+
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            from transformers import AutoTokenizer
+
+            ort_model = ORTModelForSequenceClassification.from_pretrained(model, export=True)
+            return pipeline(task, model=ort_model, tokenizer=AutoTokenizer.from_pretrained(model))
+        except ImportError:
+            logging.warning("optimum[onnxruntime] is not installed; using the torch backend.")
+
+    pipe = pipeline(task, model=model)
+    if backend == "quantized":
+        import torch
+
+        pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipe
+
+def get_pipeline(task="sentiment-analysis", model=None, backend=None):
+    """Return the shared transformers pipeline for `task`, loading it on first use."""
+    model = model or DEFAULT_MODELS.get(task)
+    backend = (backend or os.getenv("SENTIMENT_BACKEND", "torch")).lower()
+    key = (task, model, backend)
+    pipe = _pipelines.get(key)
+    if pipe is None:
+        with _lock:
+            pipe = _pipelines.get(key)
+            if pipe is None:
+                logging.info(f"Loading {task} model '{model}' ({backend} backend)...")
+                try:
+                    pipe = _pipelines[key] = _load_pipeline(task, model, backend)
+                except Exception as e:
+                    logging.error(f"Failed to initialize {task} pipeline: {e}")
+                    raise
+    return pipe
+
+def loaded_models():
+    """Return the (task, model, backend) keys of the models loaded so far."""
+    return list(_pipelines)
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+import metrics
+
+# === Portfolio Snapshot ===
+
+class PortfolioSnapshot:
+    """Account, positions and latest prices shared by every strategy on a tick.
+
+    The first strategy to ask for anything after the snapshot goes stale
+    triggers one refresh: `get_account`, `list_positions` and, for the symbols
+    announced with `begin_tick`, a single batched `get_latest_trades`. Every
+    other strategy on that tick is served from memory. Positions are indexed
+    by symbol.
+
+    Once `on_trade_update` is wired to Alpaca's trade update stream (see
+    `ExecutionGateway.attach`), positions are maintained from fill events
+    and only re-polled every `reconcile_interval` seconds, to catch events
+    lost while the stream was down or positions changed outside this
+    process. Position listeners are told about every symbol whose position
+    changed, from either source.
+    """
+
+    def __init__(self, api, max_age=1.0, reconcile_interval=60.0):
+        self.api = api
+        self.max_age = max_age
+        self.reconcile_interval = reconcile_interval
+        self.streaming = False
+        self._lock = threading.RLock()
+        self._account = None
+        self._positions = {}
+        self._prices = {}
+        self._symbols = []
+        self._fetched_at = None
+        self._positions_polled_at = None
+        self._position_listeners = []
+
+    def begin_tick(self, symbols=()):
+        """Mark the snapshot stale and note which symbols will want prices this tick."""
+        with self._lock:
+            self._symbols = list(symbols)
+            self._fetched_at = None
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._fetched_at is None or time.monotonic() - self._fetched_at > self.max_age:
+                self.refresh()
+
+    def refresh(self):
+        """Fetch account, positions and latest prices now."""
+        with self._lock, metrics.span("snapshot"):
+            self._account = self.api.get_account()
+            now = time.monotonic()
+            if (not self.streaming or self._positions_polled_at is None
+                    or now - self._positions_polled_at > self.reconcile_interval):
+                positions = {p.symbol: p for p in self.api.list_positions()}
+                for symbol in positions.keys() | self._positions.keys():
+                    old, new = self._positions.get(symbol), positions.get(symbol)
+                    if (old and old.qty) != (new and new.qty):
+                        if self.streaming and self._positions_polled_at is not None:
+                            logging.warning(f"Position for {symbol} out of step with the broker; reconciled.")
+                        self._notify(symbol, new)
+                self._positions = positions
+                self._positions_polled_at = now
+            self._prices = {}
+            if len(self._symbols) > 1 and hasattr(self.api, "get_latest_trades"):
+                try:
+                    trades = self.api.get_latest_trades(self._symbols)
+                    self._prices = {symbol: trade.price for symbol, trade in trades.items()}
+                except Exception as e:
+                    logging.warning(f"Batched latest trade request failed: {e}")
+            self._fetched_at = time.monotonic()
+
+    def account(self):
+        self._ensure_fresh()
+        with self._lock:
+            if self._account is None:  # invalidated by a fill
+                self._account = self.api.get_account()
+            return self._account
+
+    def position(self, symbol):
+        """Return the open position for `symbol`, or None."""
+        self._ensure_fresh()
+        return self._positions.get(symbol)
+
+    def positions(self):
+        self._ensure_fresh()
+        return dict(self._positions)
+
+    def latest_price(self, symbol):
+        """Return the latest trade price, from the batched fetch when available."""
+        self._ensure_fresh()
+        price = self._prices.get(symbol)
+        if price is None:
+            price = self.api.get_latest_trade(symbol).price
+            with self._lock:
+                self._prices[symbol] = price
+        return price
+
+    def on_trade_update(self, data):
+        """Apply an order update event from the trade update stream."""
+        if data.event not in ("fill", "partial_fill"):
+            return
+        order = data.order
+        symbol = order["symbol"]
+        with self._lock:
+            position_qty = getattr(data, "position_qty", None)
+            if position_qty is not None:
+                qty = float(position_qty)
+            else:
+                current = self._positions.get(symbol)
+                fill_qty = float(getattr(data, "qty", None) or order["filled_qty"])
+                qty = (float(current.qty) if current else 0.0) + (fill_qty if order["side"] == "buy" else -fill_qty)
+            if qty:
+                self._positions[symbol] = SimpleNamespace(symbol=symbol, qty=str(int(qty)) if qty.is_integer() else str(qty))
+            else:
+                self._positions.pop(symbol, None)
+            self._account = None  # buying power changed; refetch on next use
+            self._notify(symbol, self._positions.get(symbol))
+
+    def add_position_listener(self, listener):
+        """Call `listener(symbol, position)` whenever a position changes; `position` is None once closed."""
+        self._position_listeners.append(listener)
+
+    def _notify(self, symbol, position):
+        for listener in self._position_listeners:
+            try:
+                listener(symbol, position)
+            except Exception as e:
+                logging.error(f"Error in position listener for {symbol}: {e}")
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+def snapshot_for(api):
+    """Return the process-wide snapshot for an API client, creating it on first use."""
+    with _snapshots_lock:
+        snapshot = _snapshots.get(id(api))
+        if snapshot is None or snapshot.api is not api:
+            snapshot = _snapshots[id(api)] = PortfolioSnapshot(api)
+        return snapshot
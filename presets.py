@@ -0,0 +1,37 @@
+import json
+import logging
+import os
+
+PRESET_DIR = "presets"
+
+# === Preset Files ===
+
+def list_presets(preset_dir=PRESET_DIR):
+    """Returns the names of all saved presets."""
+    return sorted(f.split(".json")[0] for f in os.listdir(preset_dir) if f.endswith(".json"))
+
+def load_preset(preset_name, preset_dir=PRESET_DIR):
+    """Loads a preset from a JSON file."""
+    try:
+        with open(os.path.join(preset_dir, f"{preset_name}.json"), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logging.error(f"Preset '{preset_name}' not found.")
+        return None
+
+def save_preset(preset_name, params, preset_dir=PRESET_DIR):
+    """Saves parameters as a preset in a JSON file."""
+    os.makedirs(preset_dir, exist_ok=True)
+    with open(os.path.join(preset_dir, f"{preset_name}.json"), "w") as f:
+        json.dump(params, f, indent=4)
+
+def load_preset_dir(preset_dir=PRESET_DIR):
+    """Loads every preset in a directory; returns a dict of preset name -> params."""
+    presets = {}
+    for name in list_presets(preset_dir):
+        try:
+            with open(os.path.join(preset_dir, f"{name}.json"), "r") as f:
+                presets[name] = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Cannot read preset '{name}': {e}")
+    return presets
@@ -0,0 +1,185 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import metrics
+
+# === Rate-Limited REST Client ===
+#
+# `RateLimitedREST` wraps an `alpaca_trade_api.REST` (or anything with the
+# same methods, e.g. `backtest.StubAPI` or a REST pointed at a local fake
+# server via `base_url` and APCA_API_DATA_URL) and is used in its place:
+#
+#   * every call first takes a token from a shared token bucket sized to
+#     Alpaca's limit of 200 requests per minute;
+#   * identical read-only calls that are already in flight are coalesced, so
+#     twenty strategies asking for `get_account` at once cost one request;
+#   * rate limit (429), server (5xx) and connection errors are retried with
+#     jittered exponential backoff, as long as the retry budget allows;
+#   * `get_latest_trades` fetches many symbols per request.
+
+RATE_LIMIT = 200           # requests per minute
+BATCH_SYMBOLS = 100        # symbols per multi-symbol request
+
+# Reads that are safe to share between identical concurrent calls.
+COALESCED = frozenset({
+    "get_account", "list_positions", "get_position", "get_order", "list_orders", "get_clock",
+    "get_latest_trade", "get_latest_trades", "get_latest_quote", "get_bars", "get_bars_iter", "get_asset",
+})
+# Order placement is only retried when the request was refused outright (429),
+# never after an ambiguous failure that may have placed the order.
+UNSAFE_TO_REPEAT = frozenset({"submit_order", "replace_order", "close_position", "close_all_positions"})
+
+class TokenBucket:
+    """Allows `rate` acquisitions per `per` seconds on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate, per=60.0, burst=None):
+        self.fill_rate = rate / per
+        self.capacity = float(burst if burst is not None else max(1, rate // 10))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.fill_rate
+            time.sleep(delay)
+            waited += delay
+
+class RetryBudget:
+    """Caps retries at a fraction of successful requests so outages do not multiply traffic."""
+
+    def __init__(self, ratio=0.2, minimum=10, maximum=50):
+        self.ratio = ratio
+        self.maximum = maximum
+        self._balance = float(minimum)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self.maximum, self._balance + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def is_rate_limited(error):
+    return _status_code(error) == 429 or type(error).__name__ == "RetryException"
+
+def is_retryable(error):
+    """Rate limits, server errors and dropped connections are worth another try."""
+    if is_rate_limited(error):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500
+    return type(error).__name__ in ("ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout")
+
+class RateLimitedREST:
+    """Drop-in wrapper around an Alpaca REST client; see the notes at the top of the module."""
+
+    def __init__(self, api, rate=RATE_LIMIT, burst=None, max_retries=4, backoff=0.5, max_backoff=10.0,
+                 retry_budget=None):
+        self.api = api
+        if hasattr(api, "_retry"):
+            api._retry = 0  # alpaca_trade_api retries 429s itself; stacked, the attempts would multiply
+        self.bucket = TokenBucket(rate, 60.0, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_budget = retry_budget or RetryBudget()
+        self.requests = 0
+        self.coalesced = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self.api, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def call(*args, **kwargs):
+            if name in COALESCED:
+                return self._coalesced(name, attr, args, kwargs)
+            return self._call(name, attr, args, kwargs)
+
+        call.__name__ = name
+        return call
+
+    def _coalesced(self, name, method, args, kwargs):
+        key = (name, repr(args), repr(sorted(kwargs.items())))
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(self._call(name, method, args, kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return future.result()
+
+    def _call(self, name, method, args, kwargs):
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            if waited:
+                metrics.observe("rate_limit_wait", waited)
+            with self._lock:
+                self.requests += 1
+            try:
+                result = method(*args, **kwargs)
+                if name == "get_bars_iter":
+                    result = list(result)  # pages are fetched lazily; do it inside the retry loop
+                self.retry_budget.deposit()
+                return result
+            except Exception as e:
+                retry = (attempt < self.max_retries and is_retryable(e)
+                         and (name not in UNSAFE_TO_REPEAT or is_rate_limited(e))
+                         and self.retry_budget.withdraw())
+                if not retry:
+                    raise
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+                attempt += 1
+                logging.warning(f"{name} failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s.")
+                time.sleep(delay)
+
+    # --- Multi-symbol endpoints ---
+
+    def get_latest_trades(self, symbols, **kwargs):
+        """Latest trade per symbol, `BATCH_SYMBOLS` symbols per request; returns a dict."""
+        symbols = list(symbols)
+        if not hasattr(self.api, "get_latest_trades"):
+            return {symbol: self.get_latest_trade(symbol) for symbol in symbols}
+        trades = {}
+        for i in range(0, len(symbols), BATCH_SYMBOLS):
+            chunk = symbols[i:i + BATCH_SYMBOLS]
+            trades.update(self._coalesced("get_latest_trades", self.api.get_latest_trades, (chunk,), kwargs))
+        return trades
@@ -0,0 +1,288 @@
+import logging
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+import execution
+import metrics
+import portfolio
+
+# === Exposure Index ===
+
+UNCLASSIFIED = None  # sector of symbols missing from the sector map; never capped
+
+def _qty(position):
+    return float(position.qty) if position is not None else 0.0
+
+def _mark_price(position):
+    """Best price carried on a broker position, or None."""
+    for field in ("current_price", "avg_entry_price"):
+        value = getattr(position, field, None)
+        if value:
+            return float(value)
+    return None
+
+class ExposureIndex:
+    """Signed notional per symbol with sector and portfolio totals kept in step.
+
+    Every update touches one symbol and adjusts its sector's and the
+    portfolio's gross and net exposure by the difference, so the totals
+    never need a pass over all positions. A symbol's notional uses the last
+    price it was marked at.
+    """
+
+    def __init__(self, sectors=None):
+        self.sectors = dict(sectors or {})
+        self.gross = 0.0
+        self.net = 0.0
+        self._qty = {}
+        self._price = {}
+        self._notional = {}
+        self._sector_gross = {}
+        self._sector_net = {}
+        self._lock = threading.Lock()
+
+    def sector(self, symbol):
+        return self.sectors.get(symbol, UNCLASSIFIED)
+
+    def _apply(self, symbol, qty, price):
+        old = self._notional.get(symbol, 0.0)
+        new = qty * price
+        sector = self.sector(symbol)
+        self.gross += abs(new) - abs(old)
+        self.net += new - old
+        self._sector_gross[sector] = self._sector_gross.get(sector, 0.0) + abs(new) - abs(old)
+        self._sector_net[sector] = self._sector_net.get(sector, 0.0) + new - old
+        if qty:
+            self._qty[symbol], self._price[symbol], self._notional[symbol] = qty, price, new
+        else:
+            self._qty.pop(symbol, None)
+            self._notional.pop(symbol, None)
+            self._price[symbol] = price
+
+    def set_position(self, symbol, qty, price=None):
+        """Record the signed share count of `symbol`, optionally re-marking its price."""
+        with self._lock:
+            self._apply(symbol, float(qty), self._price.get(symbol, 0.0) if price is None else float(price))
+
+    def mark(self, symbol, price):
+        with self._lock:
+            self._apply(symbol, self._qty.get(symbol, 0.0), float(price))
+
+    def on_position(self, symbol, position):
+        """Position listener for `PortfolioSnapshot`: apply a changed (or closed) broker position."""
+        self.set_position(symbol, _qty(position), _mark_price(position) if position is not None else None)
+
+    def load(self, positions):
+        """Replace the whole index with broker positions (a dict of symbol -> position)."""
+        with self._lock:
+            self.gross = self.net = 0.0
+            self._qty, self._notional = {}, {}
+            self._sector_gross, self._sector_net = {}, {}
+            for symbol, position in positions.items():
+                self._apply(symbol, _qty(position), _mark_price(position) or self._price.get(symbol, 0.0))
+
+    def qty(self, symbol):
+        return self._qty.get(symbol, 0.0)
+
+    def sector_gross(self, sector):
+        return self._sector_gross.get(sector, 0.0)
+
+    def summary(self):
+        """Gross and net exposure of the portfolio and of every sector."""
+        with self._lock:
+            return {
+                "gross": self.gross,
+                "net": self.net,
+                "positions": len(self._qty),
+                "sectors": {
+                    str(sector): {"gross": self._sector_gross[sector], "net": self._sector_net[sector]}
+                    for sector in self._sector_gross
+                },
+            }
+
+# === Batch Allocator ===
+
+class _Signal:
+    __slots__ = ("symbol", "direction", "dollar_amount", "price", "owner", "future")
+
+    def __init__(self, symbol, direction, dollar_amount, price, owner):
+        self.symbol = symbol
+        self.direction = direction
+        self.dollar_amount = dollar_amount
+        self.price = price
+        self.owner = owner
+        self.future = Future()
+
+class Allocator:
+    """Sizes every signal of a tick together under portfolio-wide limits.
+
+    While an allocator is enabled for an API client, `Strategy.set_direction`
+    queues a signal here instead of ordering straight away, and the
+    scheduler calls `flush()` once the jobs dispatched together have
+    finished. The flush sizes all queued signals in one NumPy pass against
+    the exposure index:
+
+    * each order is capped at `max_symbol` dollars;
+    * signals in sectors at their `max_sector` gross cap are scaled down
+      together;
+    * all orders are then scaled by one factor so gross exposure stays
+      under `max_gross`, net exposure within +/-`max_net` and the opened
+      notional within buying power (plus what the flips close).
+
+    Limits are in dollars; None means no limit. Signals already on their
+    side keep their position, exactly as the execution gateway would. The
+    index follows broker positions through the portfolio snapshot (fills
+    when streaming trade updates, changed positions when polling) and
+    assumes an order's target position as soon as it is sent.
+    """
+
+    def __init__(self, api, max_gross=None, max_net=None, max_symbol=None, max_sector=None, sectors=None):
+        self.api = api
+        self.max_gross = max_gross
+        self.max_net = max_net
+        self.max_symbol = max_symbol
+        self.max_sector = max_sector
+        self.index = ExposureIndex(sectors)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        portfolio.snapshot_for(api).add_position_listener(self.index.on_position)
+
+    def submit(self, symbol, direction, dollar_amount, price, owner=None):
+        """Queue a signal for the next flush; returns a Future for the gateway's result.
+
+        `owner` (the strategy) is passed on to the gateway so it gets the fills.
+        """
+        signal = _Signal(symbol, direction, float(dollar_amount), float(price), owner)
+        with self._lock:
+            replaced = self._pending.get(symbol)
+            self._pending[symbol] = signal
+        if replaced is not None:
+            logging.info(f"Signal for {symbol} replaced by a later one on the same tick.")
+            replaced.future.set_result(None)
+        return signal.future
+
+    def flush(self):
+        """Size and send every queued signal; returns the number of orders sent."""
+        with self._lock:
+            pending, self._pending = list(self._pending.values()), {}
+        if not pending:
+            return 0
+        try:
+            with metrics.span("allocate"):
+                quantities, held = self._size(pending)
+        except Exception as e:
+            logging.error(f"Error sizing {len(pending)} signals: {e}")
+            for signal in pending:
+                signal.future.set_exception(e)
+            return 0
+        sent = 0
+        for signal, qty, hold in zip(pending, quantities, held):
+            if hold:
+                logging.info(f"Already in {signal.direction} position for {signal.symbol}. No action taken.")
+                signal.future.set_result(None)
+                continue
+            sent += self._send(signal, int(qty))
+        return sent
+
+    def _size(self, pending):
+        snapshot = portfolio.snapshot_for(self.api)
+        if not self._loaded:
+            self.index.load(snapshot.positions())
+            self._loaded = True
+        for signal in pending:
+            self.index.mark(signal.symbol, signal.price)
+
+        price = np.array([s.price for s in pending])
+        side = np.array([1.0 if s.direction == "long" else -1.0 for s in pending])
+        want = np.array([s.dollar_amount for s in pending])
+        if self.max_symbol is not None:
+            want = np.minimum(want, self.max_symbol)
+        current = np.array([self.index.qty(s.symbol) for s in pending]) * price
+        hold = current * side > 0
+        want[hold] = 0.0
+        closed = np.where(hold, 0.0, current)
+        scale = np.ones(len(pending))
+
+        if self.max_sector is not None:
+            names = [self.index.sector(s.symbol) for s in pending]
+            classified = (name for name in dict.fromkeys(names) if name is not UNCLASSIFIED)
+            sectors = {name: i for i, name in enumerate(classified)}
+            if sectors:
+                mapped = np.array([name is not UNCLASSIFIED for name in names])
+                codes = np.array([sectors.get(name, 0) for name in names])
+                used = np.array([self.index.sector_gross(name) for name in sectors])
+                opened = np.bincount(codes[mapped], want[mapped], len(sectors))
+                freed = np.bincount(codes[mapped], np.abs(closed[mapped]), len(sectors))
+                room = np.maximum(self.max_sector - (used - freed), 0.0)
+                sector_scale = np.minimum(1.0, np.divide(room, opened, out=np.ones_like(room), where=opened > 0))
+                scale = np.where(mapped, sector_scale[codes], scale)
+
+        opened = (scale * want).sum()
+        freed = np.abs(closed).sum()
+        factor = 1.0
+        if opened > 0:
+            buying_power = float(snapshot.account().buying_power)
+            factor = min(factor, max(buying_power + freed, 0.0) / opened)
+            if self.max_gross is not None:
+                factor = min(factor, max(self.max_gross - (self.index.gross - freed), 0.0) / opened)
+        if self.max_net is not None:
+            base = self.index.net - closed.sum()
+            added = (scale * want * side).sum()
+            if added > 0:
+                factor = min(factor, max(self.max_net - base, 0.0) / added)
+            elif added < 0:
+                factor = min(factor, max(self.max_net + base, 0.0) / -added)
+        scale *= max(0.0, min(1.0, factor))
+        if factor < 1.0:
+            logging.info(f"Scaled {len(pending)} signals to {factor:.0%} to stay within portfolio limits.")
+        return np.floor(scale * want / price), hold
+
+    def _send(self, signal, qty):
+        symbol = signal.symbol
+        snapshot = portfolio.snapshot_for(self.api)
+        position = snapshot.position(symbol)
+        try:
+            gateway = execution.gateway_for(self.api)
+            future = gateway.set_direction(symbol, signal.direction, qty, position, owner=signal.owner)
+        except Exception as e:
+            signal.future.set_exception(e)
+            return 0
+        if future is None:
+            signal.future.set_result(None)
+            return 0
+        self.index.set_position(symbol, qty if signal.direction == "long" else -qty, signal.price)
+
+        def done(result):
+            error = result.exception()
+            order = None if error else result.result()
+            if error or getattr(order, "status", None) in ("rejected", "canceled", "expired"):
+                self.index.on_position(symbol, snapshot.position(symbol))  # the target was not reached
+            if error:
+                signal.future.set_exception(error)
+            else:
+                signal.future.set_result(order)
+
+        future.add_done_callback(done)
+        return 1
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+def enable(api, **options):
+    """Route every strategy order for `api` through a new `Allocator(api, **options)`."""
+    allocator = Allocator(api, **options)
+    with _allocators_lock:
+        _allocators[id(api)] = allocator
+    limits = {k: v for k, v in options.items() if k != "sectors" and v is not None}
+    logging.info(f"Portfolio allocator enabled with limits {limits or 'of buying power only'}.")
+    return allocator
+
+def allocator_for(api):
+    """Return the allocator enabled for an API client, or None if orders are sized per strategy."""
+    allocator = _allocators.get(id(api))
+    if allocator is not None and allocator.api is api:
+        return allocator
+    return None
@@ -0,0 +1,424 @@
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import execution
+import metrics
+import portfolio
+import presets
+import risk
+import streaming
+from strategies import base
+
+# === Jobs ===
+
+class Job:
+    """A single (symbol, strategy, kwargs) pair run on a fixed interval.
+
+    A `check_interval` of 0 makes the job event-driven: it never runs on a
+    timer and is only started by `Scheduler.trigger`, e.g. when a new bar
+    arrives on the market data stream. Streamed bars are minute bars, so an
+    event-driven strategy must trade on the 1Min timeframe.
+    """
+
+    def __init__(self, symbol, strategy, dollar_amount, check_interval, strategy_kwargs=None):
+        self.symbol = symbol
+        self.strategy = strategy
+        self.dollar_amount = float(dollar_amount)
+        self.check_interval = int(check_interval)
+        self.strategy_kwargs = dict(strategy_kwargs or {})
+        self.next_run = None
+        self.running = False
+        self.instance = None  # the job's Strategy, created by Scheduler.add_job
+        self.pending_config = None  # (dollar_amount, params) to apply before the next tick
+        if self.check_interval < 0:
+            raise ValueError(f"Check interval for {self.name} must not be negative.")
+
+    @property
+    def event_driven(self):
+        return self.check_interval == 0
+
+    @property
+    def name(self):
+        return f"{self.strategy}:{self.symbol}"
+
+    def __repr__(self):
+        if self.event_driven:
+            return f"Job({self.name}, on every new bar)"
+        return f"Job({self.name}, every {self.check_interval}s)"
+
+class _Batch:
+    """Counts down the jobs dispatched together and calls `on_done` after the last one finishes."""
+
+    def __init__(self, size, on_done):
+        self.remaining = size
+        self.on_done = on_done
+        self._lock = threading.Lock()
+
+    def finish(self):
+        with self._lock:
+            self.remaining -= 1
+            last = self.remaining == 0
+        if last:
+            self.on_done()
+
+def check_event_timeframe(job, config):
+    """Raise ValueError if `job` is event-driven but its strategy reads bars the stream does not deliver."""
+    timeframe = config.get("timeframe")
+    if job.event_driven and timeframe is not None and str(timeframe) != streaming.STREAM_TIMEFRAME:
+        raise ValueError(f"{job.name} trades on {timeframe} bars, but only {streaming.STREAM_TIMEFRAME} "
+                         f"strategies can run on every new bar; set a check interval instead.")
+
+def next_aligned(now, interval):
+    """Return the first multiple of `interval` (in epoch seconds) strictly after `now`."""
+    return (math.floor(now / interval) + 1) * interval
+
+# === Scheduler ===
+
+class Scheduler:
+    """Runs many strategy jobs in one process on a bounded thread pool.
+
+    Ticks are aligned to wall-clock multiples of each job's interval, so a 60s
+    job always fires at :00 no matter how long the previous tick took. A job
+    whose previous tick is still running when it comes due skips that tick
+    instead of piling up. `max_workers` bounds how many jobs talk to the
+    Alpaca REST API at once.
+    """
+
+    def __init__(self, api, max_workers=8):
+        self.api = api
+        self.max_workers = max_workers
+        self._jobs = {}
+        self._by_symbol = {}
+        self._heap = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._executor = None
+        execution.gateway_for(api).add_fill_listener(self._on_fill)
+
+    def load_strategy(self, strategy):
+        """Return the registered strategy class (see `strategies.base.discover`)."""
+        return base.get_strategy(strategy)
+
+    def add_job(self, job):
+        """Register a job; it first runs on the next aligned tick.
+
+        The job's strategy is instantiated here, so unknown strategies and
+        invalid parameters raise ValueError before anything is scheduled.
+        """
+        job.instance = base.create(job.strategy, self.api, job.symbol, job.dollar_amount, job.strategy_kwargs)
+        check_event_timeframe(job, job.instance.config)
+        with self._cond:
+            if job.name in self._jobs:
+                raise ValueError(f"Job '{job.name}' is already scheduled.")
+            self._jobs[job.name] = job
+            self._by_symbol.setdefault(job.symbol, set()).add(job.name)
+            if not job.event_driven:
+                job.next_run = next_aligned(time.time(), job.check_interval)
+                heapq.heappush(self._heap, (job.next_run, job.name))
+                self._cond.notify()
+        logging.info(f"Scheduled {job!r}")
+        return job
+
+    def remove_job(self, name):
+        """Unregister a job. A tick that is already running is allowed to finish."""
+        with self._cond:
+            job = self._jobs.pop(name, None)
+            if job is not None:
+                self._by_symbol[job.symbol].discard(name)
+            self._cond.notify()
+        return job
+
+    def update_job(self, job):
+        """Give a scheduled job the dollar amount, interval and parameters of `job` (same name).
+
+        The running strategy is kept, with its bars and indicator state; the
+        new parameters are validated now (ValueError if invalid) and applied
+        just before the job's next tick, so never in the middle of one.
+        """
+        with self._cond:
+            current = self._jobs.get(job.name)
+        if current is None:
+            raise ValueError(f"Job '{job.name}' is not scheduled.")
+        config = current.instance.validate(job.strategy_kwargs)
+        check_event_timeframe(job, config)
+        with self._cond:
+            current.dollar_amount = job.dollar_amount
+            current.strategy_kwargs = dict(job.strategy_kwargs)
+            current.pending_config = (job.dollar_amount, config)
+            if job.check_interval != current.check_interval:
+                current.check_interval = job.check_interval
+                current.next_run = None
+                if not current.event_driven:
+                    current.next_run = next_aligned(time.time(), current.check_interval)
+                    heapq.heappush(self._heap, (current.next_run, current.name))
+                self._cond.notify()
+        logging.info(f"Updated {current!r}")
+        return current
+
+    def trigger(self, symbol):
+        """Run every job for `symbol` now, skipping jobs that are still running.
+
+        Safe to call from any thread, including a stream's event loop; the jobs
+        run on the worker pool. Returns the number of jobs started, 0 before
+        `start()` or after the scheduler stopped.
+        """
+        with self._cond:
+            if self._executor is None or self._stopped:
+                return 0
+            due = []
+            for name in self._by_symbol.get(symbol, ()):
+                job = self._jobs[name]
+                if not job.running:
+                    job.running = True
+                    due.append(job)
+            # Submitted under the lock, so run_forever cannot shut the pool
+            # down in between. Bars for many symbols close at once; let them
+            # share the snapshot's max_age window instead of forcing a
+            # refresh per symbol.
+            self._dispatch(due, new_tick=False)
+        return len(due)
+
+    @property
+    def jobs(self):
+        with self._cond:
+            return list(self._jobs.values())
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def start(self):
+        """Create the worker pool, so `trigger` can start jobs before `run_forever` is entered.
+
+        Call it before opening a market data stream, or the first bars are
+        ignored. `run_forever` calls it too.
+        """
+        with self._cond:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+
+    def run_forever(self):
+        """Dispatch due jobs until `stop()` is called."""
+        self.start()
+        try:
+            while True:
+                due = self._wait_for_due()
+                if due is None:
+                    break
+                self._dispatch(due)
+        finally:
+            with self._cond:
+                executor, self._executor = self._executor, None
+            executor.shutdown(wait=True)
+
+    def _submit(self, fn, *args):
+        with self._cond:
+            if self._executor is None:
+                raise RuntimeError("Scheduler is not running.")
+            self._executor.submit(fn, *args)
+
+    def _wait_for_due(self):
+        """Block until at least one job is due and return all due jobs, or None on stop."""
+        with self._cond:
+            while not self._stopped:
+                now = time.time()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    run_at, name = heapq.heappop(self._heap)
+                    job = self._jobs.get(name)
+                    if job is None or job.next_run != run_at:
+                        continue  # removed or rescheduled since it was pushed
+                    job.next_run = next_aligned(now, job.check_interval)
+                    heapq.heappush(self._heap, (job.next_run, name))
+                    if job.running:
+                        logging.warning(f"{job.name} is still running; skipping tick.")
+                        continue
+                    job.running = True
+                    due.append(job)
+                if due:
+                    return due
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._cond.wait(timeout)
+            return None
+
+    def _dispatch(self, due, new_tick=True):
+        """Submit due jobs, running each strategy's optional `prepare` hook first.
+
+        A strategy may define `prepare(symbols, api)` to do batched work
+        (e.g. one inference call) for all of its symbols due on the same tick.
+        On a timer tick the shared portfolio snapshot is marked stale so the
+        first job to need it fetches account, positions and prices for everyone.
+        When the last of the jobs finishes, their queued signals are sized
+        together by the portfolio allocator, if one is enabled.
+        """
+        if new_tick:
+            portfolio.snapshot_for(self.api).begin_tick([job.symbol for job in due])
+        batch = _Batch(len(due), self._allocate)
+        groups = {}
+        for job in due:
+            groups.setdefault(job.strategy, []).append(job)
+        for strategy, jobs in groups.items():
+            prepare = getattr(self.load_strategy(strategy), "prepare", None)
+            if prepare is None:
+                for job in jobs:
+                    self._submit(self._run_job, job, batch)
+            else:
+                self._submit(self._run_group, prepare, jobs, batch)
+
+    def _run_group(self, prepare, jobs, batch):
+        try:
+            with metrics.span("prepare", strategy=jobs[0].strategy):
+                prepare([job.symbol for job in jobs], self.api)
+        except Exception as e:
+            logging.error(f"Error preparing strategy '{jobs[0].strategy}': {e}")
+        for job in jobs:
+            try:
+                self._submit(self._run_job, job, batch)
+            except RuntimeError:  # executor shut down while preparing
+                with self._cond:
+                    job.running = False
+                batch.finish()
+
+    def _on_fill(self, symbol, order, owner):
+        """Hand a fill to the job whose strategy placed the order."""
+        with self._cond:
+            jobs = [self._jobs[name] for name in self._by_symbol.get(symbol, ()) if self._jobs[name].instance is owner]
+        for job in jobs:
+            try:
+                job.instance.on_fill(order)
+            except Exception as e:
+                logging.error(f"Error in on_fill of '{job.strategy}' for {symbol}: {e}")
+
+    def _allocate(self):
+        allocator = risk.allocator_for(self.api)
+        if allocator is not None:
+            try:
+                allocator.flush()
+            except Exception as e:
+                logging.error(f"Error allocating orders: {e}")
+
+    def _run_job(self, job, batch):
+        try:
+            # "decide" is the strategy's own time, outside fetch/compute/submit spans.
+            with self._cond:
+                pending, job.pending_config = job.pending_config, None
+            if pending is not None:
+                changed = job.instance.reconfigure(*pending)
+                if changed:
+                    logging.info(f"Applied new parameters to {job.name}: {', '.join(changed)}")
+            with metrics.span("tick", self_name="decide", strategy=job.strategy):
+                job.instance.tick()
+        except Exception as e:
+            logging.error(f"Error executing strategy '{job.strategy}' for {job.symbol}: {e}")
+        finally:
+            with self._cond:
+                job.running = False
+            batch.finish()
+
+# === Preset Reload ===
+
+def preset_jobs(params):
+    """Builds the scheduler jobs described by one preset (one per comma-separated symbol)."""
+    symbols = [s.strip().upper() for s in str(params["symbol"]).split(",") if s.strip()]
+    return [
+        Job(symbol, params["strategy"], params["dollar_amount"], params.get("check_interval", 60),
+            params.get("strategy_kwargs", {}))
+        for symbol in symbols
+    ]
+
+class PresetWatcher:
+    """Keeps a scheduler's jobs in step with a directory of presets.
+
+    `sync()` adds the jobs of new presets, removes those whose preset is
+    gone and hands changed dollar amounts, intervals and parameters to
+    `Scheduler.update_job`, so running strategies keep their bars and
+    indicator state. `start()` polls the files' modification times and
+    syncs whenever one changes. A preset that fails to load or validate
+    is logged and the jobs it last started keep running unchanged.
+    """
+
+    def __init__(self, preset_dir, scheduler, interval=2.0, on_change=None):
+        self.preset_dir = preset_dir
+        self.scheduler = scheduler
+        self.interval = interval
+        self.on_change = on_change  # called with the list of scheduled jobs after each sync
+        self._jobs = {}  # job name -> (preset name, Job as last applied)
+        self._stamps = None
+
+    def _scan(self):
+        stamps = {}
+        for name in presets.list_presets(self.preset_dir):
+            try:
+                stat = os.stat(os.path.join(self.preset_dir, f"{name}.json"))
+            except OSError:
+                continue
+            stamps[name] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def _wanted(self, names, loaded):
+        wanted = {}
+        for preset in names:
+            try:
+                jobs = preset_jobs(loaded[preset])
+            except (KeyError, TypeError, ValueError) as e:
+                if preset in loaded:
+                    logging.error(f"Invalid preset '{preset}': {e}")
+                wanted.update({name: entry for name, entry in self._jobs.items() if entry[0] == preset})
+                continue
+            for job in jobs:
+                if job.name in wanted:
+                    logging.error(f"Preset '{preset}' repeats {job.name} from preset '{wanted[job.name][0]}'; ignored.")
+                    continue
+                wanted[job.name] = (preset, job)
+        return wanted
+
+    def sync(self):
+        """Apply the presets as they are on disk now; returns True if any file changed."""
+        stamps = self._scan()
+        if stamps == self._stamps:
+            return False
+        self._stamps = stamps
+        wanted = self._wanted(sorted(stamps), presets.load_preset_dir(self.preset_dir))
+
+        for name in set(self._jobs) - set(wanted):
+            self.scheduler.remove_job(name)
+            del self._jobs[name]
+            logging.info(f"Removed {name}; its preset no longer lists it.")
+        for name, (preset, job) in wanted.items():
+            try:
+                previous = self._jobs.get(name)
+                if previous is None:
+                    self.scheduler.add_job(job)
+                elif _settings(previous[1]) != _settings(job):
+                    self.scheduler.update_job(job)
+            except ValueError as e:
+                logging.error(f"Cannot apply preset '{preset}' to {name}: {e}")
+                continue
+            self._jobs[name] = (preset, job)
+        if self.on_change is not None:
+            self.on_change(self.scheduler.jobs)
+        return True
+
+    def start(self):
+        """Sync every `interval` seconds from a background thread; returns an Event that stops it."""
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(self.interval):
+                try:
+                    self.sync()
+                except Exception as e:
+                    logging.error(f"Error reloading presets from {self.preset_dir}: {e}")
+
+        threading.Thread(target=loop, name="presets", daemon=True).start()
+        logging.info(f"Watching {self.preset_dir} for preset changes.")
+        return stop
+
+def _settings(job):
+    return (job.dollar_amount, job.check_interval, job.strategy_kwargs)
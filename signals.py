@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# === Vectorized Indicators ===
+#
+# Whole-series versions of the indicators in `indicators.py`, computed as
+# NumPy array operations. Leading values that cannot be computed yet are NaN,
+# as in pandas_ta. Every function works along the last axis, so a
+# (symbols x bars) matrix of closes is handled in the same single pass as a
+# single series.
+
+def _shift(values, periods=1):
+    """Shift along the last axis, filling the vacated bars with NaN."""
+    out = np.full(values.shape, np.nan)
+    out[..., periods:] = values[..., :-periods]
+    return out
+
+def sma(close, length):
+    """Simple moving average over `length` bars."""
+    close = np.asarray(close, dtype=float)
+    out = np.full(close.shape, np.nan)
+    if close.shape[-1] >= length:
+        out[..., length - 1:] = sliding_window_view(close, length, axis=-1).mean(axis=-1)
+    return out
+
+def _ewm_mean(values, alpha, min_periods):
+    """Adjusted exponential mean along the last axis, NaNs skipped as pandas does."""
+    if values.ndim == 1 or values.shape[0] < values.shape[1]:
+        # A few long series: pandas runs each one through a compiled loop.
+        frame = pd.DataFrame(values.T) if values.ndim == 2 else pd.Series(values)
+        return frame.ewm(alpha=alpha, min_periods=min_periods).mean().to_numpy().T
+    # Many short series: step through the bars once, updating every row at a time.
+    decay = 1.0 - alpha
+    values = np.ascontiguousarray(values.T)  # bars x series, so each step is contiguous
+    valid = ~np.isnan(values)
+    weighted = np.where(valid, values, 0.0)
+    weights = valid.astype(float)
+    for i in range(1, len(weighted)):
+        weighted[i] += decay * weighted[i - 1]
+        weights[i] += decay * weights[i - 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = weighted / weights
+    out[np.cumsum(valid, axis=0, dtype=np.int32) < min_periods] = np.nan
+    return out.T
+
+def rsi(close, length):
+    """RSI with the same adjusted-ewm smoothing as `ta.rsi`."""
+    close = np.asarray(close, dtype=float)
+    change = close - _shift(close)
+    gains = _ewm_mean(np.clip(change, 0, None), 1.0 / length, length)
+    losses = _ewm_mean(np.clip(-change, 0, None), 1.0 / length, length)
+    return 100.0 * gains / (gains + losses)
+
+def bbands(close, length, num_std=2):
+    """Return (lower, middle, upper) Bollinger bands using the population std."""
+    close = np.asarray(close, dtype=float)
+    middle = np.full(close.shape, np.nan)
+    width = np.full(close.shape, np.nan)
+    if close.shape[-1] >= length:
+        windows = sliding_window_view(close, length, axis=-1)
+        middle[..., length - 1:] = windows.mean(axis=-1)
+        width[..., length - 1:] = num_std * windows.std(axis=-1)
+    return middle - width, middle, middle + width
+
+def linear_trend(close, window):
+    """Slope and intercept of a least-squares line over each trailing `window`.
+
+    The line is fitted against the position within the window (0 to
+    window - 1), as `indicators.LinearTrend` does; NaN until `window` bars.
+    """
+    close = np.asarray(close, dtype=float)
+    slope = np.full(close.shape, np.nan)
+    intercept = np.full(close.shape, np.nan)
+    if close.shape[-1] < window or window < 2:
+        return slope, intercept
+    windows = sliding_window_view(close, window, axis=-1)
+    t = np.arange(window, dtype=float)
+    sum_t, sum_tt = t.sum(), (t * t).sum()
+    sum_y = windows.sum(axis=-1)
+    sum_ty = windows @ t
+    slope[..., window - 1:] = (window * sum_ty - sum_t * sum_y) / (window * sum_tt - sum_t ** 2)
+    intercept[..., window - 1:] = (sum_y - slope[..., window - 1:] * sum_t) / window
+    return slope, intercept
+
+def linear_trend_forecast(close, window):
+    """Least-squares fit over each trailing `window`, extrapolated one bar ahead."""
+    slope, intercept = linear_trend(close, window)
+    return intercept + slope * window
+
+# === Strategy Signals ===
+#
+# Each function mirrors the decision rule of the matching strategy class and
+# returns +1 (go long), -1 (go short) or 0 (no action) for every bar, with
+# the same shape as `close` (one row per symbol for a close matrix). Extra
+# keyword arguments such as `timeframe` are accepted and ignored so preset
+# kwargs can be passed straight through.
+
+def moving_average_signal(close, short_window, long_window, **_):
+    short_ma, long_ma = sma(close, short_window), sma(close, long_window)
+    prev_short, prev_long = _shift(short_ma), _shift(long_ma)
+    golden = (short_ma > long_ma) & (prev_short <= prev_long)
+    death = (short_ma < long_ma) & (prev_short >= prev_long)
+    return golden.astype(np.int8) - death.astype(np.int8)
+
+def rsi_signal(close, window=14, overbought=70, oversold=30, **_):
+    values = rsi(close, window)
+    return (values < oversold).astype(np.int8) - (values > overbought).astype(np.int8)
+
+def bollinger_bands_signal(close, window=20, num_std=2, **_):
+    close = np.asarray(close, dtype=float)
+    lower, _, upper = bbands(close, window, num_std)
+    return (close <= lower).astype(np.int8) - (close >= upper).astype(np.int8)
+
+def skLearn_signal(close, trend_window=20, **_):
+    close = np.asarray(close, dtype=float)
+    predicted = linear_trend_forecast(close, trend_window)
+    signal = np.where(predicted > close, 1, -1).astype(np.int8)
+    signal[np.isnan(predicted)] = 0
+    return signal
+
+SIGNALS = {
+    "moving_average": moving_average_signal,
+    "rsi": rsi_signal,
+    "bollinger_bands": bollinger_bands_signal,
+    "skLearn": skLearn_signal,
+}
+
+def compute_signal(strategy, close, **strategy_kwargs):
+    """Compute the per-bar signal of a strategy over a close series or a (symbols x bars) matrix."""
+    try:
+        func = SIGNALS[strategy]
+    except KeyError:
+        raise ValueError(f"No vectorized signal for strategy '{strategy}'.") from None
+    return func(close, **strategy_kwargs)
+
+# === Cross-Sectional Scoring ===
+
+# Bars each signal needs to decide the newest bar; None means the whole
+# history matters (RSI's exponential smoothing never forgets).
+LOOKBACK = {
+    "moving_average": lambda short_window, long_window, **_: max(short_window, long_window) + 1,
+    "rsi": lambda **_: None,
+    "bollinger_bands": lambda window=20, **_: window,
+    "skLearn": lambda trend_window=20, **_: trend_window,
+}
+
+def close_matrix(closes_by_symbol, length=None):
+    """Stack close series of different lengths into a (symbols x bars) matrix.
+
+    Series are aligned on their newest bar and left-padded with NaN, which
+    keeps the signals of short histories at 0. Returns (symbols, matrix).
+    """
+    symbols = list(closes_by_symbol)
+    if length is None:
+        length = max((len(c) for c in closes_by_symbol.values()), default=0)
+    matrix = np.full((len(symbols), length), np.nan)
+    for row, symbol in enumerate(symbols):
+        close = np.asarray(closes_by_symbol[symbol], dtype=float)[-length:] if length else ()
+        if len(close):
+            matrix[row, length - len(close):] = close
+    return symbols, matrix
+
+def latest_signals(strategy, closes, **strategy_kwargs):
+    """Signal of every symbol (row of `closes`) for the newest bar only, as a vector.
+
+    Only the trailing bars the strategy actually looks at are evaluated.
+    """
+    closes = np.asarray(closes, dtype=float)
+    if strategy not in SIGNALS:
+        raise ValueError(f"No vectorized signal for strategy '{strategy}'.")
+    lookback = LOOKBACK[strategy](**strategy_kwargs)
+    if lookback is not None:
+        closes = closes[..., -lookback:]
+    return compute_signal(strategy, closes, **strategy_kwargs)[..., -1]
@@ -0,0 +1,150 @@
+import os
+import threading
+
+import numpy as np
+
+import bars
+
+STORE_DIR = "market_data"
+
+# === On-Disk Bar Store ===
+#
+# One directory per series, <root>/<timeframe>/<SYMBOL>/, holding one raw
+# little-endian column file per field: t.i64 (epoch nanoseconds, sorted) and
+# o/h/l/c/v.f64. Files only ever grow at the end, except that the newest bar
+# may be rewritten in place while it is still forming. Reads memory-map the
+# files, so slices of the history cost nothing until they are touched.
+#
+# The timestamp column is written last, and a series' length is the length
+# of its shortest column, so a reader never sees a half-written row.
+
+_COLUMNS = (("t", "<i8", "t.i64"),) + tuple((name, "<f8", f"{name}.f64") for name in bars.FIELDS)
+_ITEMSIZE = 8
+
+def is_series_dir(path):
+    """True if `path` is a series directory written by `BarStore`."""
+    return os.path.isfile(os.path.join(path, "t.i64"))
+
+class _SeriesFiles:
+    """The column files of one (symbol, timeframe) series."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._maps = None
+        self._mapped_length = -1
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def __len__(self):
+        sizes = []
+        for _, _, filename in _COLUMNS:
+            try:
+                sizes.append(os.path.getsize(self._path(filename)))
+            except FileNotFoundError:
+                return 0
+        return min(sizes) // _ITEMSIZE
+
+    def view(self):
+        """Return every stored bar as a `bars.BarView` over memory-mapped columns."""
+        n = len(self)
+        if n != self._mapped_length:
+            if n == 0:
+                self._maps = [np.empty(0, dtype) for _, dtype, _ in _COLUMNS]
+            else:
+                self._maps = [np.memmap(self._path(filename), dtype=dtype, mode="r", shape=(n,))
+                              for _, dtype, filename in _COLUMNS]
+            self._mapped_length = n
+        return bars.BarView(*self._maps)
+
+    def _repair(self, n):
+        """Cut every column back to `n` rows, dropping a partially written one."""
+        for _, _, filename in _COLUMNS:
+            path = self._path(filename)
+            if os.path.exists(path) and os.path.getsize(path) != n * _ITEMSIZE:
+                os.truncate(path, n * _ITEMSIZE)
+
+    def append(self, view):
+        """Merge bars into the files the way `bars.BarBuffer.extend` merges them; returns the new bar count."""
+        os.makedirs(self.directory, exist_ok=True)
+        n = len(self)
+        self._repair(n)
+        first_new = 0
+        replace = False
+        if n:
+            last = int(self.view().t[-1])
+            first_new = int(np.searchsorted(view.t, last, side="left"))
+            replace = first_new < len(view) and view.t[first_new] == last
+        if replace:
+            self._write(view, first_new, first_new + 1, offset=(n - 1) * _ITEMSIZE)
+            first_new += 1
+        if first_new < len(view):
+            self._write(view, first_new, len(view), offset=n * _ITEMSIZE)
+        self._mapped_length = -1
+        return len(view) - first_new
+
+    def _write(self, view, start, stop, offset):
+        # Fields first, timestamps last: the row only counts once t is on disk.
+        for name, dtype, filename in _COLUMNS[1:] + _COLUMNS[:1]:
+            data = np.ascontiguousarray(getattr(view, name)[start:stop], dtype=dtype)
+            with open(self._path(filename), "r+b" if os.path.exists(self._path(filename)) else "wb") as f:
+                f.seek(offset)
+                f.write(data.tobytes())
+
+class BarStore:
+    """Append-only columnar store of bars, one series per (symbol, timeframe).
+
+    The live bar cache writes every bar it fetches here and backfills from
+    here on startup, so a restart only downloads the bars it missed. Offline
+    tools (`backtest.load_bars`, `sweep.load_closes`) read the same files.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _get(self, symbol, timeframe):
+        key = (symbol, str(timeframe))
+        with self._lock:
+            files = self._series.get(key)
+            if files is None:
+                files = self._series[key] = _SeriesFiles(os.path.join(self.root, str(timeframe), symbol))
+            return files
+
+    def symbols(self, timeframe):
+        """Symbols with stored bars for `timeframe`."""
+        directory = os.path.join(self.root, str(timeframe))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory) if is_series_dir(os.path.join(directory, name)))
+
+    def last_time(self, symbol, timeframe):
+        """Epoch nanoseconds of the newest stored bar, or None."""
+        view = self._get(symbol, timeframe).view()
+        return int(view.t[-1]) if len(view) else None
+
+    def read(self, symbol, timeframe, start=None, end=None, limit=None):
+        """Return stored bars as a zero-copy `bars.BarView`.
+
+        `start` and `end` (inclusive) may be anything `bars.to_epoch_ns`
+        accepts; `limit` keeps only the newest bars of the range.
+        """
+        view = self._get(symbol, timeframe).view()
+        lo = 0 if start is None else int(np.searchsorted(view.t, bars.to_epoch_ns(start), side="left"))
+        hi = len(view) if end is None else int(np.searchsorted(view.t, bars.to_epoch_ns(end), side="right"))
+        if limit is not None:
+            lo = max(lo, hi - int(limit))
+        return bars.BarView(*(getattr(view, name)[lo:hi] for name in bars.BarView.__slots__))
+
+    def append(self, symbol, timeframe, view):
+        """Add bars newer than the last stored one (which they may replace); returns how many were new."""
+        if not len(view):
+            return 0
+        files = self._get(symbol, timeframe)
+        with self._lock:
+            return files.append(view)
+
+def read_series(path):
+    """Read one series directory (e.g. market_data/1Min/AAPL) as a `bars.BarView`."""
+    return _SeriesFiles(path).view()
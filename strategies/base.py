@@ -0,0 +1,235 @@
+import logging
+import pkgutil
+import threading
+from importlib import import_module
+
+import bar_cache
+import execution
+import portfolio
+import risk
+
+# === Strategy Parameters ===
+
+REQUIRED = object()
+_MISSING = object()
+
+class Param:
+    """Declares one strategy parameter: its type, default and allowed range or values.
+
+    A `live` parameter is only read when deciding, so a running strategy can
+    take a new value without rebuilding its state (see `Strategy.reconfigure`).
+    """
+
+    def __init__(self, type, default=REQUIRED, min=None, max=None, choices=None, live=False):
+        self.type = type
+        self.default = default
+        self.min = min
+        self.max = max
+        self.choices = tuple(choices) if choices is not None else None
+        self.live = live
+
+    def compile(self, name):
+        """Build the checking function for this parameter once, when the strategy class is defined."""
+        type_, default, low, high, choices = self.type, self.default, self.min, self.max, self.choices
+
+        def check(value=_MISSING):
+            if value is _MISSING:
+                if default is REQUIRED:
+                    raise ValueError(f"Missing required parameter '{name}'.")
+                return default
+            try:
+                if type_ is int and not float(value).is_integer():
+                    raise ValueError
+                value = type_(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Parameter '{name}' must be {type_.__name__}, got {value!r}.") from None
+            if low is not None and value < low:
+                raise ValueError(f"Parameter '{name}' must be at least {low}, got {value!r}.")
+            if high is not None and value > high:
+                raise ValueError(f"Parameter '{name}' must be at most {high}, got {value!r}.")
+            if choices is not None and value not in choices:
+                raise ValueError(f"Parameter '{name}' must be one of {list(choices)}, got {value!r}.")
+            return value
+
+        return check
+
+# === Strategy Base Class ===
+
+class Strategy:
+    """One strategy trading one symbol, kept alive between ticks.
+
+    Subclasses declare `params` and implement the lifecycle hooks:
+
+    * `init()` once on construction, to set up per-symbol state such as
+      indicators; the validated parameters are available as attributes;
+    * `warmup(bars)` once with the first bar window, before the first
+      `on_bar`;
+    * `on_bar(bars)` every tick, to decide and call `set_direction`;
+    * `on_fill(order)` when one of the strategy's orders fills.
+
+    Strategies that trade on bars set `bar_limit` (and a `timeframe`
+    parameter) in `init`; `tick()` then fetches that many bars through the
+    shared bar cache. A class may also define `prepare(symbols, api)` as a
+    classmethod to batch work for every symbol due on the same tick.
+    """
+
+    name = None
+    params = {}
+    bar_limit = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._checks = {name: param.compile(name) for name, param in cls.params.items()}
+
+    @classmethod
+    def validate(cls, kwargs):
+        """Return the complete, type-checked parameter dict, or raise ValueError."""
+        unknown = set(kwargs) - set(cls._checks)
+        if unknown:
+            raise ValueError(f"Unknown parameters for strategy '{cls.name}': {sorted(unknown)}")
+        return {name: check(kwargs.get(name, _MISSING)) for name, check in cls._checks.items()}
+
+    def __init__(self, api, symbol, dollar_amount, **kwargs):
+        self.api = api
+        self.symbol = symbol
+        self.dollar_amount = float(dollar_amount)
+        self.config = self.validate(kwargs)
+        self.__dict__.update(self.config)
+        self.warm = False
+        self.init()
+
+    # --- Lifecycle hooks ---
+
+    def init(self):
+        pass
+
+    def warmup(self, bars):
+        pass
+
+    def on_bar(self, bars):
+        raise NotImplementedError
+
+    def on_fill(self, order):
+        pass
+
+    def reconfigure(self, dollar_amount, config):
+        """Apply a new dollar amount and validated parameters; returns the names of changed parameters.
+
+        If only `live` parameters changed the strategy keeps all its state.
+        Otherwise `init()` and `warmup` run again, rebuilding indicators from
+        the bars already held by the shared bar cache.
+        """
+        self.dollar_amount = float(dollar_amount)
+        changed = sorted(name for name in set(config) | set(self.config) if config.get(name) != self.config.get(name))
+        if changed:
+            self.config = dict(config)
+            self.__dict__.update(self.config)
+            if not all(getattr(self.params.get(name), "live", False) for name in changed):
+                self.bar_limit = type(self).bar_limit
+                self.init()
+                self.warm = False
+        return changed
+
+    def tick(self):
+        """Fetch bars (if the strategy uses them) and run `on_bar` once."""
+        bars = None
+        if self.bar_limit:
+            bars = bar_cache.get_bars(self.api, self.symbol, self.timeframe, limit=self.bar_limit)
+        if not self.warm:
+            self.warmup(bars)
+            self.warm = True
+        self.on_bar(bars)
+
+    # --- Shared position and order helpers ---
+
+    @property
+    def snapshot(self):
+        return portfolio.snapshot_for(self.api)
+
+    def position(self):
+        """The open position in this strategy's symbol, or None."""
+        return self.snapshot.position(self.symbol)
+
+    def latest_price(self):
+        return self.snapshot.latest_price(self.symbol)
+
+    def quantity(self, price):
+        """Shares worth `dollar_amount` at `price`, capped by buying power."""
+        buying_power = float(self.snapshot.account().buying_power)
+        if self.dollar_amount / price < buying_power:
+            return int(self.dollar_amount / price)
+        return int(buying_power / price)
+
+    def set_direction(self, direction, price=None):
+        """Hold a long or short position sized at `price` (the latest trade by default).
+
+        With a portfolio allocator enabled (see `risk.enable`) the signal is
+        queued and sized together with the rest of the tick's signals.
+        """
+        price = self.latest_price() if price is None else price
+        allocator = risk.allocator_for(self.api)
+        if allocator is not None:
+            return allocator.submit(self.symbol, direction, self.dollar_amount, price, owner=self)
+        gateway = execution.gateway_for(self.api)
+        return gateway.set_direction(self.symbol, direction, self.quantity(price), self.position(), owner=self)
+
+class FunctionStrategy(Strategy):
+    """Adapter for strategy modules that only define `trade_logic(symbol, dollar_amount, api, **kwargs)`."""
+
+    module = None
+
+    @classmethod
+    def validate(cls, kwargs):
+        return dict(kwargs)
+
+    def on_bar(self, bars):
+        self.module.trade_logic(self.symbol, self.dollar_amount, self.api, **self.config)
+
+# === Registry ===
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def _strategy_class(name, module):
+    for value in vars(module).values():
+        if isinstance(value, type) and issubclass(value, Strategy) and value.__module__ == module.__name__:
+            value.name = name
+            return value
+    if hasattr(module, "trade_logic"):
+        attrs = {"name": name, "module": module}
+        if hasattr(module, "prepare"):
+            attrs["prepare"] = staticmethod(module.prepare)
+        return type(f"{name}_strategy", (FunctionStrategy,), attrs)
+    return None
+
+def discover():
+    """Import every module in the strategies package once and register its strategy by module name."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            package = import_module("strategies")
+            found = {}
+            for info in pkgutil.iter_modules(package.__path__):
+                if info.name == "base":
+                    continue
+                try:
+                    cls = _strategy_class(info.name, import_module(f"strategies.{info.name}"))
+                except ImportError as e:
+                    logging.warning(f"Skipping strategy '{info.name}': {e}")
+                    continue
+                if cls is not None:
+                    found[info.name] = cls
+            _registry = found
+            logging.info(f"Discovered strategies: {', '.join(sorted(found))}")
+        return _registry
+
+def get_strategy(name):
+    """Return the strategy class registered as `name`."""
+    try:
+        return discover()[name]
+    except KeyError:
+        raise ValueError(f"Strategy '{name}' not found in 'strategies' directory.") from None
+
+def create(name, api, symbol, dollar_amount, strategy_kwargs=None):
+    """Instantiate strategy `name` for one symbol, validating its parameters."""
+    return get_strategy(name)(api, symbol, dollar_amount, **(strategy_kwargs or {}))
@@ -1,69 +1,39 @@
 # strategies/bollinger_bands.py
 
 import logging
-import pandas as pd
-import pandas_ta as ta
+import indicators
+from strategies.base import Param, Strategy
 
-def get_current_position(symbol, api):
-    """Check if a position exists for the given symbol."""
-    try:
-        positions = api.list_positions()
-        for position in positions:
-            if position.symbol == symbol:
-                return position
-        return None
-    except Exception as e:
-        logging.error(f"Error fetching positions: {e}")
-        return None
+class BollingerBandsStrategy(Strategy):
+    """Go long at the lower band, short at the upper band."""
 
-def trade_logic(symbol, dollar_amount, api, window=20, num_std=2, timeframe="1Day"):
-    """Execute trading logic based on Bollinger Bands."""
-    try:
-        barset = api.get_bars(symbol, timeframe, limit=window + 10)
-        df = pd.DataFrame([bar._raw for bar in barset])
-        df.set_index('t', inplace=True)
+    params = {
+        "window": Param(int, 20, min=2),
+        "num_std": Param(float, 2, min=0),
+        "timeframe": Param(str, "1Day"),
+    }
 
-        bbands = ta.bbands(df['c'], length=window, std=num_std)
-        df = df.join(bbands)
+    def init(self):
+        self.bar_limit = self.window + 10
+        self.feed = indicators.IndicatorFeed(lambda: {"bbands": indicators.BollingerBands(self.window, self.num_std)})
 
-        current_price = df['c'].iloc[-1]
-        lower_band = df[f'BBL_{window}_{num_std}'].iloc[-1]
-        upper_band = df[f'BBU_{window}_{num_std}'].iloc[-1]
+    def on_bar(self, bars):
+        """Execute trading logic based on Bollinger Bands."""
+        try:
+            bbands = self.feed.update(bars)["bbands"]
+            if bbands.middle is None:
+                logging.info(f"Not enough bars to compute Bollinger Bands for {self.symbol}.")
+                return
 
-        current_position = get_current_position(symbol, api)
-        account = api.get_account()
-        buying_power = float(account.buying_power)
-        quantity = int(dollar_amount / current_price) if dollar_amount / current_price < buying_power else int(buying_power/current_price)
+            current_price = bars.c[-1]
 
-        if current_price <= lower_band:
-            if current_position:
-                if int(current_position.qty) < 0:
-                    logging.info(f"Closing short position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=abs(int(current_position.qty)), side='buy', type='market', time_in_force='gtc')
-                    time.sleep(1)
-                    logging.info(f"Opening long position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=quantity, side='buy', type='market', time_in_force='gtc')
-                else:
-                    logging.info(f"Already in long position for {symbol}. No action taken.")
-            else:
-                logging.info(f"No current position for {symbol}. Opening long position...")
-                api.submit_order(symbol=symbol, qty=quantity, side='buy', type='market', time_in_force='gtc')
+            if current_price <= bbands.lower:
+                self.set_direction("long", current_price)
 
-        elif current_price >= upper_band:
-            if current_position:
-                if int(current_position.qty) > 0:
-                    logging.info(f"Closing long position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=int(current_position.qty), side='sell', type='market', time_in_force='gtc')
-                    time.sleep(1)
-                    logging.info(f"Opening short position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=quantity, side='sell', type='market', time_in_force='gtc')
-                else:
-                    logging.info(f"Already in short position for {symbol}. No action taken.")
+            elif current_price >= bbands.upper:
+                self.set_direction("short", current_price)
             else:
-                logging.info(f"No current position for {symbol}. Opening short position...")
-                api.submit_order(symbol=symbol, qty=quantity, side='sell', type='market', time_in_force='gtc')
-        else:
-            logging.info(f"No signal detected for {symbol}.")
+                logging.info(f"No signal detected for {self.symbol}.")
 
-    except Exception as e:
-        logging.error(f"Error executing Bollinger Bands strategy: {e}")
\ No newline at end of file
+        except Exception as e:
+            logging.error(f"Error executing Bollinger Bands strategy: {e}")
@@ -1,32 +1,93 @@
-import time
+import hashlib
 import logging
-from transformers import pipeline
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+import models
+from strategies.base import Strategy
+
+# === Batched, Cached Inference ===
+
+BATCH_SIZE = 32          # texts per forward pass
+TRUNCATION = True        # cut texts longer than the model's maximum input
+MAX_LENGTH = None        # optional token limit below the model's maximum
+CACHE_SIZE = 10000       # scored texts kept in memory
+CACHE_TTL = 6 * 60 * 60  # seconds before a cached score is recomputed
+
+class _ScoreCache:
+    """LRU cache with a time-to-live, keyed on a hash of the text."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text):
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
 
-# Initialize sentiment analysis pipeline (this should ideally be done only once)
-try:
-    sentiment_pipeline = pipeline("sentiment-analysis")
-except Exception as e:
-    logging.error(f"Failed to initialize sentiment pipeline: {e}")
-    exit(1)
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+_cache = _ScoreCache(CACHE_SIZE, CACHE_TTL)
+
+def score_texts(texts, batch_size=None):
+    """Return a (label, score) pair per text, or None for empty texts.
+
+    Texts already scored within CACHE_TTL come from the cache; the rest are
+    de-duplicated and sent to the pipeline together in batches.
+    """
+    keys = [_cache.key(text) if text else None for text in texts]
+    results = {key: _cache.get(key) for key in keys if key is not None}
+    missing = {key: text for key, text in zip(keys, texts) if key is not None and results[key] is None}
+    if missing:
+        options = {"batch_size": batch_size or BATCH_SIZE, "truncation": TRUNCATION}
+        if MAX_LENGTH:
+            options["max_length"] = MAX_LENGTH
+        try:
+            with metrics.span("compute", strategy="sentiment"):
+                outputs = models.get_pipeline("sentiment-analysis")(list(missing.values()), **options)
+        except Exception as e:
+            logging.error(f"Sentiment analysis error: {e}")
+            outputs = [None] * len(missing)
+        for key, output in zip(missing, outputs):
+            if output is None:
+                continue
+            results[key] = (output['label'].upper(), output['score'])
+            _cache.put(key, results[key])
+    return [results.get(key) if key is not None else None for key in keys]
 
 def get_sentiment(texts):
     """Analyze sentiment from a list of text inputs."""
     positive_score = 0.0
     negative_score = 0.0
-    for text in texts:
-        if not text:
-            continue
-        try:
-            result = sentiment_pipeline(text)[0]
-            label = result['label'].upper()
-            score = result['score']
-            if label == "POSITIVE":
-                positive_score += score
-            else:
-                negative_score += score
-        except Exception as e:
-            logging.error(f"Sentiment analysis error: {e}")
+    for result in score_texts(texts):
+        if result is None:
             continue
+        label, score = result
+        if label == "POSITIVE":
+            positive_score += score
+        else:
+            negative_score += score
 
     if positive_score + negative_score == 0:
         return "neutral"
@@ -40,56 +101,29 @@ def fetch_news_and_chat(symbol):
     chat_text = "Investors are excited about the future of this company!"
     return [news_text, chat_text]
 
-def get_current_position(symbol, api):
-    """Check if a position exists for the given symbol."""
-    try:
-        positions = api.list_positions()
-        for position in positions:
-            if position.symbol == symbol:
-                return position
-    except Exception as e:
-        logging.error(f"Error fetching positions: {e}")
-    return None
-
-def trade_logic(symbol, dollar_amount, api):
-    """Execute trading logic based on the aggregated sentiment."""
-    texts = fetch_news_and_chat(symbol)
-    sentiment = get_sentiment(texts)
-    try:
-        account = api.get_account()
-        buying_power = float(account.buying_power)
-        current_price = api.get_latest_trade(symbol).price
-        quantity = int(dollar_amount / current_price) if dollar_amount / current_price < buying_power else int(buying_power/current_price)
-        current_position = get_current_position(symbol, api)
-
-        if sentiment == "positive":
-            if current_position:
-                if int(current_position.qty) < 0:
-                    logging.info(f"Closing short position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=abs(int(current_position.qty)), side='buy', type='market', time_in_force='gtc')
-                    time.sleep(1)
-                    logging.info(f"Opening long position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=quantity, side='buy', type='market', time_in_force='gtc')
-                else:
-                    logging.info(f"Already in long position for {symbol}. No action taken.")
-            else:
-                logging.info(f"No current position for {symbol}. Opening long position...")
-                api.submit_order(symbol=symbol, qty=quantity, side='buy', type='market', time_in_force='gtc')
-
-        elif sentiment == "negative":
-            if current_position:
-                if int(current_position.qty) > 0:
-                    logging.info(f"Closing long position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=int(current_position.qty), side='sell', type='market', time_in_force='gtc')
-                    time.sleep(1)
-                    logging.info(f"Opening short position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=quantity, side='sell', type='market', time_in_force='gtc')
-                else:
-                    logging.info(f"Already in short position for {symbol}. No action taken.")
+class SentimentStrategy(Strategy):
+    """Go long on positive news and chat sentiment, short on negative."""
+
+    @classmethod
+    def prepare(cls, symbols, api):
+        """Score the texts of every symbol due on this tick in one batched call.
+
+        Called by the scheduler before the individual ticks, which then find
+        all their texts in the cache.
+        """
+        score_texts([text for symbol in symbols for text in fetch_news_and_chat(symbol)])
+
+    def on_bar(self, bars):
+        """Execute trading logic based on the aggregated sentiment."""
+        texts = fetch_news_and_chat(self.symbol)
+        sentiment = get_sentiment(texts)
+        try:
+            if sentiment == "positive":
+                self.set_direction("long")
+
+            elif sentiment == "negative":
+                self.set_direction("short")
             else:
-                logging.info(f"No current position for {symbol}. Opening short position...")
-                api.submit_order(symbol=symbol, qty=quantity, side='sell', type='market', time_in_force='gtc')
-        else:
-            logging.info("Sentiment unclear. No trading action taken.")
-    except Exception as e:
-        logging.error(f"Error executing trade logic: {e}")
+                logging.info("Sentiment unclear. No trading action taken.")
+        except Exception as e:
+            logging.error(f"Error executing trade logic: {e}")
@@ -1,78 +1,48 @@
 # strategies/sklearn_pattern.py
 
 import logging
-import pandas as pd
-from sklearn.linear_model import LinearRegression
-import numpy as np
+import indicators
+from strategies.base import Param, Strategy
+
+class LinearTrendStrategy(Strategy):
+    """Go long when the regression trend points above the last close, short when below.
+
+    The least-squares fit over the last `trend_window` closes is kept up to
+    date bar by bar (`indicators.LinearTrend`) and gives the same forecast
+    as fitting scikit-learn's LinearRegression, which is no longer needed.
+    """
+
+    params = {
+        "timeframe": Param(str, "1Day"),
+        "limit": Param(int, 100, min=2),
+        "trend_window": Param(int, 20, min=2),
+    }
+
+    def init(self):
+        self.bar_limit = max(self.limit, self.trend_window)
+        self.feed = indicators.IndicatorFeed(lambda: {"trend": indicators.LinearTrend(self.trend_window)})
+
+    def on_bar(self, bars):
+        """Execute trading logic based on a linear regression trend."""
+        try:
+            # Predict the next price from the trend line
+            predicted_price = self.feed.update(bars)["trend"].value
+            if predicted_price is None:
+                logging.info(f"Not enough bars to fit a trend for {self.symbol}.")
+                return
+
+            # Determine trend direction
+            current_price = bars.c[-1]
+            trend_direction = "up" if predicted_price > current_price else "down"
+
+            if trend_direction == "up":
+                self.set_direction("long", current_price)
+
+            elif trend_direction == "down":
+                self.set_direction("short", current_price)
 
-def get_current_position(symbol, api):
-    """Check if a position exists for the given symbol."""
-    try:
-        positions = api.list_positions()
-        for position in positions:
-            if position.symbol == symbol:
-                return position
-        return None
-    except Exception as e:
-        logging.error(f"Error fetching positions: {e}")
-        return None
-
-def trade_logic(symbol, dollar_amount, api, timeframe="1Day", limit=100, trend_window=20):
-    """Execute trading logic based on scikit-learn trend analysis."""
-    try:
-        barset = api.get_bars(symbol, timeframe, limit=limit)
-        df = pd.DataFrame([bar._raw for bar in barset])
-        df.set_index('t', inplace=True)
-
-        # Calculate trend using linear regression
-        prices = df['c'].values.reshape(-1, 1)
-        times = np.arange(len(prices)).reshape(-1, 1)
-        model = LinearRegression()
-        model.fit(times[-trend_window:], prices[-trend_window:])
-
-        # Predict future price
-        future_time = times[-1] + 1
-        predicted_price = model.predict([[future_time]])[0][0]
-
-        # Determine trend direction
-        current_price = df['c'].iloc[-1]
-        trend_direction = "up" if predicted_price > current_price else "down"
-
-        current_position = get_current_position(symbol, api)
-        account = api.get_account()
-        buying_power = float(account.buying_power)
-        quantity = int(dollar_amount / current_price) if dollar_amount / current_price < buying_power else int(buying_power/current_price)
-
-        if trend_direction == "up":
-            if current_position:
-                if int(current_position.qty) < 0:
-                    logging.info(f"Closing short position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=abs(int(current_position.qty)), side='buy', type='market', time_in_force='gtc')
-                    time.sleep(1)
-                    logging.info(f"Opening long position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=quantity, side='buy', type='market', time_in_force='gtc')
-                else:
-                    logging.info(f"Already in long position for {symbol}. No action taken.")
-            else:
-                logging.info(f"No current position for {symbol}. Opening long position...")
-                api.submit_order(symbol=symbol, qty=quantity, side='buy', type='market', time_in_force='gtc')
-
-        elif trend_direction == "down":
-            if current_position:
-                if int(current_position.qty) > 0:
-                    logging.info(f"Closing long position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=int(current_position.qty), side='sell', type='market', time_in_force='gtc')
-                    time.sleep(1)
-                    logging.info(f"Opening short position for {symbol}...")
-                    api.submit_order(symbol=symbol, qty=quantity, side='sell', type='market', time_in_force='gtc')
-                else:
-                    logging.info(f"Already in short position for {symbol}. No action taken.")
             else:
-                logging.info(f"No current position for {symbol}. Opening short position...")
-                api.submit_order(symbol=symbol, qty=quantity, side='sell', type='market', time_in_force='gtc')
-
-        else:
-            logging.info(f"No signal detected for {symbol}.")
+                logging.info(f"No signal detected for {self.symbol}.")
 
-    except Exception as e:
-        logging.error(f"Error executing sklearn_pattern strategy: {e}")
\ No newline at end of file
+        except Exception as e:
+            logging.error(f"Error executing sklearn_pattern strategy: {e}")
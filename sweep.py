@@ -0,0 +1,164 @@
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import backtest
+import signals
+import store
+from presets import save_preset
+
+# === Parameter Grids ===
+
+def param_grid(grid):
+    """Expand {"window": [10, 14], "oversold": [25, 30]} into a list of kwargs dicts."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+# === Shared Bar Data ===
+#
+# All close series are packed into one shared-memory block. Workers attach
+# to it once at startup and build zero-copy NumPy views, so tasks only carry
+# a symbol name and a list of kwargs instead of pickled DataFrames.
+
+_closes = {}
+_shm = None
+
+def _pack_closes(closes_by_symbol):
+    total = sum(len(c) for c in closes_by_symbol.values())
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8)
+    buffer = np.ndarray((total,), dtype=np.float64, buffer=shm.buf)
+    layout = {}
+    offset = 0
+    for symbol, close in closes_by_symbol.items():
+        buffer[offset:offset + len(close)] = close
+        layout[symbol] = (offset, len(close))
+        offset += len(close)
+    return shm, layout
+
+def _attach(shm_name, layout):
+    global _shm
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    buffer = np.ndarray((sum(n for _, n in layout.values()),), dtype=np.float64, buffer=_shm.buf)
+    for symbol, (offset, length) in layout.items():
+        _closes[symbol] = buffer[offset:offset + length]
+
+def _evaluate(strategy, symbol, param_sets, dollar_amount, slippage_bps, commission):
+    close = _closes[symbol]
+    results = []
+    for params in param_sets:
+        signal = signals.compute_signal(strategy, close, **params)
+        sim = backtest.simulate(close, signal, dollar_amount, slippage_bps, commission)
+        results.append((symbol, params, backtest.summarize(sim, dollar_amount)))
+    return results
+
+# === Sweep ===
+
+def sweep(closes_by_symbol, strategy, grid, dollar_amount, slippage_bps=0.0, commission=0.0,
+          max_workers=None, chunk_size=None):
+    """Backtest every combination in `grid` on every symbol across a process pool.
+
+    `closes_by_symbol` maps symbols to 1-D close arrays. Returns a list of
+    (symbol, params, summary) tuples in no particular order.
+    """
+    max_workers = max_workers or os.cpu_count()
+    param_sets = param_grid(grid)
+    if chunk_size is None:
+        # About four tasks per worker keeps every core busy without flooding the queue.
+        chunks_per_symbol = math.ceil(max_workers * 4 / max(1, len(closes_by_symbol)))
+        chunk_size = max(1, math.ceil(len(param_sets) / chunks_per_symbol))
+    closes = {s: np.ascontiguousarray(c, dtype=np.float64) for s, c in closes_by_symbol.items()}
+    shm, layout = _pack_closes(closes)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach,
+                                 initargs=(shm.name, layout)) as pool:
+            futures = [
+                pool.submit(_evaluate, strategy, symbol, chunk, dollar_amount, slippage_bps, commission)
+                for symbol in closes
+                for chunk in _chunks(param_sets, chunk_size)
+            ]
+            return [row for future in futures for row in future.result()]
+    finally:
+        shm.close()
+        shm.unlink()
+
+def best_by_symbol(results, metric="pnl", top=1):
+    """Return the `top` parameter sets per symbol ranked by `metric`, highest first."""
+    by_symbol = {}
+    for symbol, params, summary in results:
+        by_symbol.setdefault(symbol, []).append((params, summary))
+    return {
+        symbol: sorted(rows, key=lambda row: row[1][metric], reverse=True)[:top]
+        for symbol, rows in by_symbol.items()
+    }
+
+def load_closes(data_dir):
+    """Load the close series of every CSV/Parquet file in `data_dir`, keyed by file name.
+
+    Bar store series directories count too, so a timeframe directory of the
+    store (e.g. market_data/1Day) can be swept directly.
+    """
+    closes = {}
+    for name in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, name)
+        symbol, ext = os.path.splitext(name)
+        if store.is_series_dir(path):
+            closes[name.upper()] = np.array(store.read_series(path).c)
+        elif ext in (".csv", ".parquet", ".pq"):
+            closes[symbol.upper()] = backtest.load_bars(path)["c"].to_numpy(dtype=float)
+    return closes
+
+# === Command Line ===
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def _parse_grid(text):
+    key, _, values = text.partition("=")
+    return key, [_parse_value(v) for v in values.split(",")]
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Grid-search strategy parameters over local bar files.")
+    parser.add_argument("data_dir", help="directory of <SYMBOL>.csv / <SYMBOL>.parquet bar files or bar store series")
+    parser.add_argument("--strategy", required=True, choices=sorted(signals.SIGNALS))
+    parser.add_argument("--grid", action="append", default=[], type=_parse_grid,
+                        help="parameter values to try, e.g. --grid window=10,14,20")
+    parser.add_argument("--dollar-amount", type=float, default=1000.0)
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--commission", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--metric", default="pnl", help="summary field to maximise")
+    parser.add_argument("--save-presets", action="store_true", help="save the best parameters per symbol as presets")
+    parser.add_argument("--timeframe", default="1Day", help="timeframe stored in saved presets")
+    parser.add_argument("--check-interval", type=int, default=60, help="check interval stored in saved presets")
+    args = parser.parse_args()
+
+    closes = load_closes(args.data_dir)
+    results = sweep(closes, args.strategy, dict(args.grid), args.dollar_amount,
+                    slippage_bps=args.slippage_bps, commission=args.commission, max_workers=args.workers)
+    logging.info(f"Evaluated {len(results)} configurations over {len(closes)} symbols.")
+
+    for symbol, [(params, summary)] in best_by_symbol(results, args.metric).items():
+        print(f"{symbol}: {params} -> {json.dumps(summary)}")
+        if args.save_presets:
+            save_preset(f"{args.strategy}_{symbol}", {
+                "symbol": symbol,
+                "dollar_amount": args.dollar_amount,
+                "check_interval": args.check_interval,
+                "strategy": args.strategy,
+                "strategy_kwargs": dict(params, timeframe=args.timeframe),
+            })
@@ -0,0 +1,40 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+
+STRATEGIES = [
+    ("rsi", {"window": 14}),
+    ("bollinger_bands", {"window": 20, "num_std": 2}),
+    ("moving_average", {"short_window": 10, "long_window": 30, "timeframe": "1Min"}),
+    ("skLearn", {"trend_window": 20}),
+]
+
+@pytest.fixture(scope="module")
+def bars():
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 800)))
+    return pd.DataFrame({"o": close, "h": close, "l": close, "c": close, "v": np.ones(len(close))},
+                        index=pd.date_range("2024-01-02 14:30", periods=len(close), freq="min", tz="UTC"))
+
+@pytest.mark.parametrize("strategy,kwargs", STRATEGIES)
+def test_replay_matches_the_vectorized_backtest_fill_for_fill(bars, strategy, kwargs):
+    logging.disable(logging.CRITICAL)
+    try:
+        expected = backtest.backtest(bars, strategy, 1000, **kwargs).fills
+        api = backtest.replay(strategy, bars, "TEST", 1000, cash=1e9, **kwargs)
+    finally:
+        logging.disable(logging.NOTSET)
+    assert len(expected) > 0
+    replayed = pd.DataFrame({
+        "side": [order.side for order in api.orders],
+        "qty": [int(order.qty) for order in api.orders],
+        "price": [order.filled_avg_price for order in api.orders],
+    }, index=pd.to_datetime([order.t for order in api.orders], utc=True))
+    pd.testing.assert_index_equal(replayed.index, expected.index, check_names=False)
+    assert list(replayed["side"]) == list(expected["side"])
+    assert list(replayed["qty"]) == list(expected["qty"])
+    np.testing.assert_allclose(replayed["price"], expected["price"], rtol=1e-12)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+import bar_cache
+from backtest import StubAPI
+from store import BarStore
+
+def minute_bars(start, periods):
+    index = pd.date_range(start, periods=periods, freq="min", tz="UTC")
+    close = np.arange(periods, dtype=float) + 1.0
+    return pd.DataFrame({"o": close, "h": close, "l": close, "c": close, "v": close}, index=index)
+
+def test_a_backfill_after_a_gap_keeps_the_stored_history(tmp_path):
+    store = BarStore(str(tmp_path))
+    old = minute_bars("2024-01-02 14:30", 5)
+    api = StubAPI({"AAPL": old})
+    api.advance("AAPL", 4)
+    bar_cache.BarCache(store=store).get_bars(api, "AAPL", "1Min", 5)
+    assert len(store.read("AAPL", "1Min")) == 5
+
+    new = minute_bars("2024-01-05 14:30", 20)
+    api = StubAPI({"AAPL": new})
+    api.advance("AAPL", 19)
+    view = bar_cache.BarCache(store=store).get_bars(api, "AAPL", "1Min", 10)
+    assert len(view) == 10
+    stored = store.read("AAPL", "1Min")
+    assert len(stored) == 15  # the old bars, the gap, then the backfilled window
+    assert np.all(np.diff(stored.t) > 0)
+    assert stored.t[0] == pd.Timestamp("2024-01-02 14:30", tz="UTC").value
+    assert stored.t[-1] == pd.Timestamp(new.index[-1]).value
+
+def test_a_backfill_that_overlaps_the_store_joins_up(tmp_path):
+    store = BarStore(str(tmp_path))
+    bars = minute_bars("2024-01-02 14:30", 12)
+    api = StubAPI({"AAPL": bars})
+    api.advance("AAPL", 5)
+    bar_cache.BarCache(store=store).get_bars(api, "AAPL", "1Min", 6)
+    api.advance("AAPL", 11)
+    bar_cache.BarCache(store=store).get_bars(api, "AAPL", "1Min", 8)
+    stored = store.read("AAPL", "1Min")
+    assert len(stored) == 12
+    np.testing.assert_array_equal(stored.c, bars["c"].to_numpy())
@@ -0,0 +1,135 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import execution
+from backtest import StubAPI
+from scheduler import Job, Scheduler
+
+class BrokerAPI:
+    """Accepts market orders and leaves them open until `fill` is called, like a live broker."""
+
+    def __init__(self):
+        self.orders = {}
+        self.on_submit = None
+
+    def submit_order(self, symbol, qty, side, **kwargs):
+        order = SimpleNamespace(id=str(len(self.orders) + 1), symbol=symbol, qty=str(qty), side=side,
+                                filled_qty="0", status="accepted")
+        self.orders[order.id] = order
+        response = SimpleNamespace(**vars(order))
+        if self.on_submit:
+            self.on_submit(order)
+        return response
+
+    def fill(self, order_id):
+        order = self.orders[order_id]
+        order.status, order.filled_qty = "filled", order.qty
+
+    def reject(self, order_id):
+        self.orders[order_id].status = "rejected"
+
+    def list_orders(self, status="open", limit=500):
+        return [SimpleNamespace(**vars(o)) for o in self.orders.values() if o.status in ("new", "accepted")]
+
+    def get_order(self, order_id):
+        return SimpleNamespace(**vars(self.orders[order_id]))
+
+def record_fills(gateway):
+    fills = []
+    done = threading.Event()
+
+    def listener(symbol, order, owner):
+        fills.append((symbol, order, owner))
+        done.set()
+
+    gateway.add_fill_listener(listener)
+    return fills, done
+
+def test_polling_reports_fills_of_accepted_orders_to_the_owner():
+    api = BrokerAPI()
+    gateway = execution.ExecutionGateway(api, max_workers=0, poll_interval=0.01)
+    fills, filled = record_fills(gateway)
+    owner = object()
+    gateway.set_direction("AAPL", "long", 10, owner=owner).result()
+    assert fills == []
+    api.fill("1")
+    assert filled.wait(2)
+    symbol, order, fill_owner = fills[0]
+    assert (symbol, order.status, order.filled_qty, fill_owner) == ("AAPL", "filled", "10", owner)
+    gateway.poll()
+    assert len(fills) == 1  # reported once
+
+def test_a_fill_streamed_before_the_submit_returns_is_reported_once_with_its_owner():
+    api = BrokerAPI()
+    gateway = execution.ExecutionGateway(api, max_workers=0)
+    gateway.streaming = True
+    fills, _ = record_fills(gateway)
+
+    def stream_fill(order):
+        api.fill(order.id)
+        gateway.on_trade_update(SimpleNamespace(event="fill", order=dict(vars(api.orders[order.id]))))
+
+    api.on_submit = stream_fill
+    owner = object()
+    gateway.set_direction("AAPL", "short", 5, owner=owner).result()
+    assert len(fills) == 1
+    assert fills[0][2] is owner and fills[0][1]["status"] == "filled"
+
+def test_a_netted_flip_rejected_later_closes_then_opens_without_holding_a_worker():
+    api = BrokerAPI()
+    gateway = execution.ExecutionGateway(api, max_workers=1)
+    short = SimpleNamespace(qty="-5")
+    result = gateway.set_direction("AAPL", "long", 10, short)
+    gateway._executor.submit(lambda: None).result()
+    assert [(o.qty, o.side) for o in api.orders.values()] == [("15", "buy")]
+    assert gateway.set_direction("AAPL", "long", 10, short) is None  # the flip is still being worked
+
+    api.reject("1")
+    gateway.poll()
+    gateway._executor.submit(lambda: None).result()
+    assert [(o.qty, o.side) for o in api.orders.values()][1:] == [("5", "buy")]
+    other = gateway.set_direction("MSFT", "long", 3).result(timeout=2)  # the single worker is free
+    assert other.symbol == "MSFT"
+    assert not result.done()
+
+    api.fill("2")
+    gateway.poll()
+    order = result.result(timeout=2)
+    assert (order.id, order.qty, order.side) == ("4", "10", "buy")
+    assert gateway.set_direction("AAPL", "short", 10, SimpleNamespace(qty="10")) is not None
+    gateway.shutdown()
+
+def test_a_close_that_does_not_fill_leaves_the_position_flat():
+    api = BrokerAPI()
+    gateway = execution.ExecutionGateway(api, max_workers=0, net_flips=False)
+    result = gateway.set_direction("AAPL", "short", 10, SimpleNamespace(qty="5"))
+    assert [(o.qty, o.side) for o in api.orders.values()] == [("5", "sell")]
+    api.orders["1"].status = "canceled"
+    gateway.poll()
+    assert result.result().status == "canceled"
+    assert len(api.orders) == 1
+
+def test_orders_seen_only_on_the_stream_are_not_reported():
+    gateway = execution.ExecutionGateway(BrokerAPI(), max_workers=0)
+    fills, _ = record_fills(gateway)
+    gateway.on_trade_update(SimpleNamespace(event="fill", order={"id": "x", "symbol": "AAPL", "status": "filled"}))
+    assert fills == []
+
+def test_scheduler_hands_a_fill_only_to_the_strategy_that_ordered(monkeypatch):
+    import pandas as pd
+
+    bars = pd.DataFrame({"o": [1.0], "h": [1.0], "l": [1.0], "c": [1.0], "v": [1.0]},
+                        index=pd.date_range("2024-01-02", periods=1, freq="min", tz="UTC"))
+    api = StubAPI({"AAPL": bars})
+    execution.gateway_for(api, max_workers=0)
+    scheduler = Scheduler(api)
+    rsi = scheduler.add_job(Job("AAPL", "rsi", 1000, 60))
+    bands = scheduler.add_job(Job("AAPL", "bollinger_bands", 1000, 60))
+    received = {rsi.name: [], bands.name: []}
+    for job in (rsi, bands):
+        monkeypatch.setattr(job.instance, "on_fill", received[job.name].append)
+    rsi.instance.set_direction("long", 1.0)
+    assert len(received[rsi.name]) == 1
+    assert received[bands.name] == []
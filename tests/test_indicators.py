@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import bars
+import indicators
+
+TOLERANCE = 1e-9
+
+def random_closes(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+def reference_sma(close, length):
+    return pd.Series(close).rolling(length).mean().to_numpy()
+
+def reference_rsi(close, length):
+    """pandas_ta's rsi: Wilder smoothing as an adjusted ewm of gains and losses."""
+    change = pd.Series(close).diff()
+    gains = change.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    losses = (-change).clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    return (100 * gains / (gains + losses)).to_numpy()
+
+def reference_bbands(close, length, num_std):
+    """pandas_ta's bbands: population standard deviation around a rolling mean."""
+    series = pd.Series(close)
+    middle = series.rolling(length).mean()
+    width = num_std * series.rolling(length).std(ddof=0)
+    return (middle - width).to_numpy(), middle.to_numpy(), (middle + width).to_numpy()
+
+def streamed(indicator, close, field="value"):
+    out = []
+    for value in close:
+        indicator.update(value)
+        result = getattr(indicator, field)
+        out.append(np.nan if result is None else result)
+    return np.array(out)
+
+def assert_matches(actual, expected):
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=TOLERANCE * np.nanmax(np.abs(expected)))
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("length", [2, 14, 50])
+def test_sma_matches_rolling_mean(seed, length):
+    close = random_closes(seed=seed)
+    assert_matches(streamed(indicators.SMA(length), close), reference_sma(close, length))
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("length", [2, 14, 50])
+def test_rsi_matches_wilder_ewm(seed, length):
+    close = random_closes(seed=seed)
+    assert_matches(streamed(indicators.RSI(length), close), reference_rsi(close, length))
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("length,num_std", [(2, 1.0), (20, 2.0), (50, 2.5)])
+def test_bollinger_bands_match_population_std(seed, length, num_std):
+    close = random_closes(seed=seed)
+    expected = reference_bbands(close, length, num_std)
+    for field, reference in zip(("lower", "middle", "upper"), expected):
+        assert_matches(streamed(indicators.BollingerBands(length, num_std), close, field), reference)
+
+@pytest.mark.parametrize("make", [
+    lambda: indicators.SMA(10),
+    lambda: indicators.RSI(10),
+    lambda: indicators.BollingerBands(10),
+    lambda: indicators.LinearTrend(10),
+])
+def test_replace_equals_pushing_the_final_value(make):
+    close = random_closes(100)
+    revised, direct = make(), make()
+    for value in close:
+        revised.update(value * 1.01)  # a still-forming bar ...
+        revised.update(value * 0.99, replace=True)
+        revised.update(value, replace=True)  # ... revised until it closes
+        direct.update(value)
+    for field in ("value", "middle"):
+        if hasattr(direct, field):
+            assert getattr(revised, field) == pytest.approx(getattr(direct, field), rel=1e-12)
+
+# === IndicatorFeed ===
+
+def bar_view(close, start=0):
+    t = (np.arange(len(close), dtype=np.int64) + start) * 60_000_000_000
+    close = np.asarray(close, dtype=float)
+    return bars.BarView(t, close, close, close, close, np.ones(len(close)))
+
+def make_feed(length=14):
+    feed = indicators.IndicatorFeed(lambda: {"sma": indicators.SMA(length), "rsi": indicators.RSI(length)})
+    return feed, length
+
+def test_feed_warm_up_fills_from_the_first_window():
+    close = random_closes(60)
+    feed, length = make_feed()
+    result = feed.update(bar_view(close[:length - 1]))
+    assert result["sma"].value is None and result["rsi"].value is None
+    result = feed.update(bar_view(close))
+    assert result["sma"].value == pytest.approx(reference_sma(close, length)[-1], rel=1e-12)
+    assert result["rsi"].value == pytest.approx(reference_rsi(close, length)[-1], rel=1e-12)
+
+def test_feed_pushes_only_new_bars_from_a_sliding_window():
+    close = random_closes(200)
+    feed, length = make_feed()
+    window = 40
+    for end in range(window, len(close) + 1):
+        result = feed.update(bar_view(close[end - window:end], start=end - window))
+    assert result["sma"].value == pytest.approx(reference_sma(close, length)[-1], rel=1e-12)
+    assert result["rsi"].value == pytest.approx(reference_rsi(close, length)[-1], rel=1e-12)
+
+def test_feed_replaces_a_bar_with_the_same_timestamp():
+    close = random_closes(50)
+    feed, length = make_feed()
+    forming = close.copy()
+    forming[-1] *= 1.05
+    feed.update(bar_view(forming))
+    result = feed.update(bar_view(close))
+    assert result["sma"].value == pytest.approx(reference_sma(close, length)[-1], rel=1e-12)
+    assert result["rsi"].value == pytest.approx(reference_rsi(close, length)[-1], rel=1e-12)
+
+def test_feed_rebuilds_after_a_gap():
+    close = random_closes(300)
+    feed, length = make_feed()
+    feed.update(bar_view(close[:50]))
+    later = close[200:260]
+    result = feed.update(bar_view(later, start=200))  # no overlap with what was seen
+    assert result["sma"].value == pytest.approx(reference_sma(later, length)[-1], rel=1e-12)
+    assert result["rsi"].value == pytest.approx(reference_rsi(later, length)[-1], rel=1e-12)
+
+def test_feed_ignores_a_window_older_than_what_was_seen():
+    close = random_closes(80)
+    feed, length = make_feed()
+    feed.update(bar_view(close[:60]))
+    feed.update(bar_view(close[10:30], start=10))  # e.g. a stale cached copy
+    result = feed.update(bar_view(close[40:80], start=40))
+    assert result["sma"].value == pytest.approx(reference_sma(close, length)[-1], rel=1e-12)
+    assert result["rsi"].value == pytest.approx(reference_rsi(close, length)[-1], rel=1e-12)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import indicators
+import signals
+
+def random_closes(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+def reference_fits(close, window):
+    """Slope, intercept and next-bar prediction of a least-squares fit per trailing window."""
+    t = np.arange(window, dtype=float)
+    design = np.column_stack([t, np.ones(window)])
+    fits = np.full((len(close), 3), np.nan)
+    for end in range(window, len(close) + 1):
+        (slope, intercept), *_ = np.linalg.lstsq(design, close[end - window:end], rcond=None)
+        fits[end - 1] = slope, intercept, intercept + slope * window
+    return fits
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("window", [2, 5, 20, 60])
+def test_linear_trend_matches_lstsq(seed, window):
+    close = random_closes(seed=seed)
+    expected = reference_fits(close, window)
+    slope, intercept = signals.linear_trend(close, window)
+    forecast = signals.linear_trend_forecast(close, window)
+    for actual, column in ((slope, 0), (intercept, 1), (forecast, 2)):
+        assert np.isnan(actual[:window - 1]).all()
+        np.testing.assert_allclose(actual[window - 1:], expected[window - 1:, column], rtol=1e-10, atol=1e-10)
+
+def test_first_full_window_matches_polyfit():
+    close = random_closes(20)
+    slope, intercept = signals.linear_trend(close, 20)
+    expected_slope, expected_intercept = np.polyfit(np.arange(20.0), close, 1)
+    assert slope[-1] == pytest.approx(expected_slope, rel=1e-10)
+    assert intercept[-1] == pytest.approx(expected_intercept, rel=1e-10)
+
+def test_matrix_rows_match_single_series():
+    closes = np.vstack([random_closes(seed=seed) for seed in range(4)])
+    slope, intercept = signals.linear_trend(closes, 20)
+    for row, close in enumerate(closes):
+        expected = signals.linear_trend(close, 20)
+        np.testing.assert_allclose(slope[row], expected[0], rtol=1e-12, equal_nan=True)
+        np.testing.assert_allclose(intercept[row], expected[1], rtol=1e-12, equal_nan=True)
+
+@pytest.mark.parametrize("window", [2, 20])
+def test_streaming_linear_trend_matches_lstsq(window):
+    close = random_closes(500)
+    expected = reference_fits(close, window)
+    trend = indicators.LinearTrend(window)
+    for i, value in enumerate(close):
+        trend.update(value)
+        if i < window - 1:
+            assert trend.value is None
+            continue
+        assert trend.slope == pytest.approx(expected[i, 0], rel=1e-9, abs=1e-9)
+        assert trend.intercept == pytest.approx(expected[i, 1], rel=1e-9)
+        assert trend.value == pytest.approx(expected[i, 2], rel=1e-9)
+
+def test_constant_series_has_zero_slope():
+    close = np.full(50, 123.25)
+    slope, intercept = signals.linear_trend(close, 20)
+    np.testing.assert_allclose(slope[19:], 0.0, atol=1e-12)
+    np.testing.assert_allclose(intercept[19:], 123.25, rtol=1e-12)
+    trend = indicators.LinearTrend(20)
+    for value in close:
+        trend.update(value)
+    assert trend.slope == pytest.approx(0.0, abs=1e-12)
+    assert trend.value == pytest.approx(123.25, rel=1e-12)
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+import metrics
+
+@pytest.fixture
+def registry():
+    metrics.registry.clear()
+    metrics.enable()
+    yield metrics.registry
+    metrics.disable()
+    metrics.registry.clear()
+
+def test_quantiles_interpolate_inside_the_bucket():
+    histogram = metrics.Histogram(buckets=(1.0, 2.0, 4.0))
+    for seconds in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(seconds)
+    assert histogram.quantile(0.25) == pytest.approx(1.0)   # all of the first bucket
+    assert histogram.quantile(0.5) == pytest.approx(1.5)    # half way into (1, 2]
+    assert histogram.quantile(1.0) == pytest.approx(3.0)    # capped at the max seen
+    assert metrics.Histogram().quantile(0.5) is None
+
+def test_the_overflow_bucket_interpolates_up_to_the_max():
+    histogram = metrics.Histogram(buckets=(1.0,))
+    histogram.observe(5.0)
+    histogram.observe(9.0)
+    assert histogram.quantile(0.5) == pytest.approx(5.0)
+    assert histogram.quantile(1.0) == pytest.approx(9.0)
+
+def test_prometheus_buckets_are_cumulative(registry):
+    for seconds in (0.00002, 0.003, 0.003, 60.0):
+        registry.observe("fetch", seconds, (("strategy", "rsi"),))
+    lines = registry.render_prometheus().splitlines()
+    assert lines[:2] == ["# HELP tradingbot_stage_seconds Time spent in each stage of a bot tick.",
+                         "# TYPE tradingbot_stage_seconds histogram"]
+    buckets = [line for line in lines if "_bucket" in line]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert len(buckets) == len(metrics.BUCKETS) + 1
+    assert counts == sorted(counts)
+    assert 'tradingbot_stage_seconds_bucket{stage="fetch",strategy="rsi",le="2.5e-05"} 1' in lines
+    assert 'tradingbot_stage_seconds_bucket{stage="fetch",strategy="rsi",le="0.005"} 3' in lines
+    assert 'tradingbot_stage_seconds_bucket{stage="fetch",strategy="rsi",le="30.0"} 3' in lines
+    assert buckets[-1] == 'tradingbot_stage_seconds_bucket{stage="fetch",strategy="rsi",le="+Inf"} 4'
+    assert 'tradingbot_stage_seconds_count{stage="fetch",strategy="rsi"} 4' in lines
+    sum_line = next(line for line in lines if line.startswith("tradingbot_stage_seconds_sum"))
+    assert float(sum_line.rsplit(" ", 1)[1]) == pytest.approx(60.00602)
+
+def test_self_time_excludes_nested_spans(registry):
+    with metrics.span("tick", self_name="decide", strategy="rsi"):
+        with metrics.span("fetch"):
+            time.sleep(0.05)
+        time.sleep(0.01)
+    stages = {row["stage"]: row for row in registry.summary()}
+    assert stages["fetch"]["strategy"] == "rsi"  # inherited from the parent span
+    assert stages["fetch"]["max"] >= 0.05
+    assert stages["tick"]["max"] >= 0.06
+    assert 0.01 <= stages["decide"]["max"] < 0.05
+    assert stages["decide"]["max"] == pytest.approx(stages["tick"]["max"] - stages["fetch"]["max"])
+
+def test_spans_record_nothing_while_disabled():
+    metrics.registry.clear()
+    with metrics.span("fetch"):
+        pass
+    assert metrics.registry.summary() == []
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import portfolio
+
+class PositionsAPI:
+    def __init__(self, positions):
+        self.positions = positions
+        self.polls = 0
+
+    def get_account(self):
+        return SimpleNamespace(buying_power="1000")
+
+    def list_positions(self):
+        self.polls += 1
+        return [SimpleNamespace(symbol=symbol, qty=qty) for symbol, qty in self.positions.items()]
+
+def fill(symbol, qty, side):
+    return SimpleNamespace(event="fill", order={"symbol": symbol, "filled_qty": qty, "side": side})
+
+def test_streamed_positions_are_reconciled_with_the_broker_periodically():
+    api = PositionsAPI({"AAPL": "10"})
+    snapshot = portfolio.PortfolioSnapshot(api, max_age=0.0, reconcile_interval=3600.0)
+    snapshot.streaming = True
+    changes = []
+    snapshot.add_position_listener(lambda symbol, position: changes.append((symbol, position and position.qty)))
+    assert snapshot.position("AAPL").qty == "10"
+    snapshot.on_trade_update(fill("AAPL", "5", "buy"))
+    api.positions = {"AAPL": "15", "MSFT": "3"}  # the MSFT fill event was lost
+    snapshot.refresh()
+    assert api.polls == 1
+    assert snapshot.position("MSFT") is None
+
+    snapshot.reconcile_interval = 0.0
+    snapshot.refresh()
+    assert api.polls == 2
+    assert snapshot.position("MSFT").qty == "3"
+    assert changes == [("AAPL", "10"), ("AAPL", "15"), ("MSFT", "3")]
+
+def test_positions_are_polled_on_every_refresh_without_a_stream():
+    api = PositionsAPI({})
+    snapshot = portfolio.PortfolioSnapshot(api)
+    snapshot.refresh()
+    snapshot.refresh()
+    assert api.polls == 2
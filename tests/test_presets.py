@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+import execution
+import presets
+from backtest import StubAPI
+from scheduler import PresetWatcher, Scheduler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_sweep_does_not_load_the_live_trading_modules():
+    code = ("import sys, sweep; print(sorted(m for m in ('scheduler', 'execution', 'portfolio', 'risk', "
+            "'strategies.base') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+def write(preset_dir, name, params):
+    presets.save_preset(name, params, str(preset_dir))
+    stat = os.stat(preset_dir / f"{name}.json")
+    os.utime(preset_dir / f"{name}.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))  # a visible change
+
+def test_watcher_applies_added_edited_broken_and_removed_presets(tmp_path):
+    index = pd.date_range("2024-01-02", periods=1, freq="min", tz="UTC")
+    api = StubAPI({"AAPL": pd.DataFrame({"o": 1.0, "h": 1.0, "l": 1.0, "c": 1.0, "v": 1.0}, index=index)})
+    execution.gateway_for(api, max_workers=0)
+    scheduler = Scheduler(api)
+    watcher = PresetWatcher(str(tmp_path), scheduler, interval=0)
+
+    write(tmp_path, "a", {"symbol": "aapl, msft", "strategy": "rsi", "dollar_amount": 1000})
+    assert watcher.sync()
+    assert sorted(job.name for job in scheduler.jobs) == ["rsi:AAPL", "rsi:MSFT"]
+    assert not watcher.sync()  # nothing changed on disk
+
+    write(tmp_path, "a", {"symbol": "AAPL,MSFT", "strategy": "rsi", "dollar_amount": 500,
+                          "strategy_kwargs": {"oversold": 20}})
+    watcher.sync()
+    assert {job.dollar_amount for job in scheduler.jobs} == {500.0}
+    assert all(job.pending_config[1]["oversold"] == 20 for job in scheduler.jobs)
+
+    (tmp_path / "a.json").write_text("{broken")
+    watcher.sync()
+    assert len(scheduler.jobs) == 2  # the jobs it last started keep running
+
+    write(tmp_path, "a", {"symbol": "AAPL", "strategy": "rsi", "dollar_amount": 500,
+                          "strategy_kwargs": {"oversold": 20}})
+    watcher.sync()
+    assert [job.name for job in scheduler.jobs] == ["rsi:AAPL"]
+    os.remove(tmp_path / "a.json")
+    watcher.sync()
+    assert scheduler.jobs == []
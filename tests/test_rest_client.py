@@ -0,0 +1,157 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from rest_client import RateLimitedREST, RetryBudget, TokenBucket
+
+class HTTPStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+class FakeAPI:
+    """Answers each call with the next scripted outcome: an exception to raise or a value to return."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def get_account(self):
+        return self._next()
+
+    def submit_order(self, **kwargs):
+        return self._next()
+
+def wrap(api, **options):
+    options.setdefault("rate", 60000)
+    options.setdefault("backoff", 0.001)
+    return RateLimitedREST(api, **options)
+
+# === Token Bucket ===
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=20, per=1.0, burst=2)
+    start = time.monotonic()
+    waits = [bucket.acquire() for _ in range(6)]
+    elapsed = time.monotonic() - start
+    assert waits[:2] == [0.0, 0.0]
+    assert elapsed >= (6 - 2) / 20 * 0.9
+    assert elapsed < 1.0
+
+# === Retries ===
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_rate_limits_and_server_errors_are_retried(status):
+    api = FakeAPI(HTTPStatusError(status), HTTPStatusError(status), "account")
+    assert wrap(api).get_account() == "account"
+    assert api.calls == 3
+
+def test_retries_stop_at_max_retries():
+    api = FakeAPI(*[HTTPStatusError(503)] * 10)
+    with pytest.raises(HTTPStatusError):
+        wrap(api, max_retries=2).get_account()
+    assert api.calls == 3
+
+def test_an_exhausted_retry_budget_fails_fast():
+    api = FakeAPI(HTTPStatusError(429), "account")
+    with pytest.raises(HTTPStatusError):
+        wrap(api, retry_budget=RetryBudget(minimum=0)).get_account()
+    assert api.calls == 1
+
+@pytest.mark.parametrize("status", [400, 403, 404, 422])
+def test_client_errors_are_not_retried(status):
+    api = FakeAPI(HTTPStatusError(status), "account")
+    with pytest.raises(HTTPStatusError):
+        wrap(api).get_account()
+    assert api.calls == 1
+
+def test_orders_are_retried_only_when_refused_with_429():
+    api = FakeAPI(HTTPStatusError(429), "order")
+    assert wrap(api).submit_order(symbol="AAPL", qty=1, side="buy") == "order"
+    assert api.calls == 2
+    api = FakeAPI(HTTPStatusError(500), "order")
+    with pytest.raises(HTTPStatusError):
+        wrap(api).submit_order(symbol="AAPL", qty=1, side="buy")
+    assert api.calls == 1
+
+# === Coalescing ===
+
+def test_identical_in_flight_reads_share_one_request():
+    release = threading.Event()
+    api = FakeAPI()
+
+    def slow_account():
+        api.calls += 1
+        release.wait(5)
+        return SimpleNamespace(buying_power="1000")
+
+    api.get_account = slow_account
+    client = wrap(api)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_account())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while client.coalesced < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert api.calls == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+
+def test_orders_are_never_coalesced():
+    api = FakeAPI("first", "second")
+    client = wrap(api)
+    assert [client.submit_order(symbol="AAPL", qty=1, side="buy") for _ in range(2)] == ["first", "second"]
+
+# === Against a Local HTTP Server ===
+
+class _AccountHandler(BaseHTTPRequestHandler):
+    statuses = []
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        body = {"id": "fake", "buying_power": "1000"} if status == 200 else {"code": status, "message": "slow down"}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def account_server():
+    _AccountHandler.statuses, _AccountHandler.hits = [], 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _AccountHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+def test_alpaca_client_retries_once_per_attempt_against_a_fake_server(account_server):
+    rest = pytest.importorskip("alpaca_trade_api").REST
+    base_url = f"http://127.0.0.1:{account_server.server_address[1]}"
+    _AccountHandler.statuses = [429]
+    assert wrap(rest("key", "secret", base_url=base_url)).get_account().buying_power == "1000"
+    assert _AccountHandler.hits == 2
+
+    _AccountHandler.statuses, _AccountHandler.hits = [429] * 10, 0
+    with pytest.raises(Exception) as error:
+        wrap(rest("key", "secret", base_url=base_url), max_retries=1).get_account()
+    assert getattr(error.value, "status_code", None) == 429
+    assert _AccountHandler.hits == 2  # alpaca_trade_api's own 429 retries would multiply this
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+import execution
+import risk
+from backtest import StubAPI
+
+def make_api(prices, positions=None, cash=100000.0):
+    index = pd.date_range("2024-01-02", periods=1, freq="min", tz="UTC")
+    bars = {symbol: pd.DataFrame({"o": [p], "h": [p], "l": [p], "c": [p], "v": [1.0]}, index=index)
+            for symbol, p in prices.items()}
+    api = StubAPI(bars, cash=cash)
+    api.positions.update(positions or {})
+    execution.gateway_for(api, max_workers=0)
+    return api
+
+def test_sector_caps_with_classified_and_unclassified_symbols():
+    api = make_api({"XYZ": 10.0, "AAPL": 100.0, "JPM": 50.0, "MSFT": 100.0})
+    allocator = risk.Allocator(api, max_sector=5000.0,
+                               sectors={"AAPL": "tech", "MSFT": "tech", "JPM": "fin"})
+    for symbol, price in (("XYZ", 10.0), ("AAPL", 100.0), ("JPM", 50.0), ("MSFT", 100.0)):
+        allocator.submit(symbol, "long", 4000.0, price)
+    assert allocator.flush() == 4
+    assert api.positions == {"XYZ": 400, "AAPL": 25, "JPM": 80, "MSFT": 25}  # tech shares its cap
+    assert allocator.index.sector_gross("tech") == 5000.0
+
+def test_a_flip_scaled_to_nothing_still_closes_the_old_side():
+    api = make_api({"JPM": 50.0}, positions={"JPM": -10})
+    allocator = risk.Allocator(api, max_gross=0.0)
+    future = allocator.submit("JPM", "long", 1000.0, 50.0)
+    assert allocator.flush() == 1
+    assert future.result().side == "buy"
+    assert api.positions["JPM"] == 0
+    assert allocator.index.qty("JPM") == 0.0
+
+def test_a_signal_on_the_side_already_held_sends_nothing():
+    api = make_api({"JPM": 50.0}, positions={"JPM": 10})
+    allocator = risk.Allocator(api, max_gross=100000.0)
+    future = allocator.submit("JPM", "long", 1000.0, 50.0)
+    assert allocator.flush() == 0
+    assert future.result() is None
+    assert api.orders == []
+    assert api.positions["JPM"] == 10
+
+def test_the_gateway_keeps_a_position_when_a_same_side_order_sizes_to_zero():
+    api = make_api({"JPM": 50.0}, positions={"JPM": -10})
+    gateway = execution.gateway_for(api)
+    assert gateway.set_direction("JPM", "short", 0, SimpleNamespace(qty="-10")) is None
+    assert api.orders == []
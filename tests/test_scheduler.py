@@ -0,0 +1,85 @@
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import execution
+import streaming
+from backtest import StubAPI
+import scheduler as scheduler_module
+from scheduler import Job, Scheduler, next_aligned
+
+def make_scheduler():
+    index = pd.date_range("2024-01-02 14:30", periods=5, freq="min", tz="UTC")
+    bars = pd.DataFrame({"o": 1.0, "h": 1.0, "l": 1.0, "c": 1.0, "v": 1.0}, index=index)
+    api = StubAPI({"AAPL": bars})
+    execution.gateway_for(api, max_workers=0)
+    return Scheduler(api, max_workers=2), bars
+
+def test_event_driven_jobs_need_minute_bars():
+    scheduler, _ = make_scheduler()
+    with pytest.raises(ValueError, match="1Day"):
+        scheduler.add_job(Job("AAPL", "rsi", 1000, 0))
+    job = scheduler.add_job(Job("AAPL", "rsi", 1000, 60))
+    with pytest.raises(ValueError, match="1Day"):
+        scheduler.update_job(Job("AAPL", "rsi", 1000, 0))
+    assert scheduler.update_job(Job("AAPL", "rsi", 1000, 0, {"timeframe": "1Min"})) is job
+    assert job.event_driven
+
+def test_bars_streamed_before_run_forever_trigger_the_jobs(monkeypatch):
+    scheduler, bars = make_scheduler()
+    job = scheduler.add_job(Job("AAPL", "rsi", 1000, 0, {"timeframe": "1Min"}))
+    ticks = []
+    ticked = threading.Event()
+
+    def tick():
+        ticks.append(1)
+        ticked.set()
+
+    monkeypatch.setattr(job.instance, "tick", tick)
+    assert scheduler.trigger("AAPL") == 0  # no worker pool yet
+    scheduler.start()
+    stream = streaming.ReplayStream({"AAPL": bars.iloc[:1]})
+    streaming.BarStream(scheduler, stream).subscribe(["AAPL"])
+    stream.run()
+    assert ticked.wait(2)
+    thread = threading.Thread(target=scheduler.run_forever)
+    thread.start()
+    scheduler.stop()
+    thread.join(2)
+    assert ticks == [1]
+    assert scheduler.trigger("AAPL") == 0
+
+def test_ticks_are_aligned_to_the_wall_clock():
+    assert next_aligned(125.3, 60) == 180
+    assert next_aligned(180, 60) == 240  # strictly after
+    assert next_aligned(1000.5, 15) == 1005
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.5]
+    monkeypatch.setattr(scheduler_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+def test_a_job_still_running_skips_its_tick_and_a_removed_job_stops(clock, caplog):
+    scheduler, _ = make_scheduler()
+    slow = scheduler.add_job(Job("AAPL", "rsi", 1000, 60))
+    fast = scheduler.add_job(Job("MSFT", "rsi", 1000, 60))
+    assert slow.next_run == fast.next_run == 1020
+
+    clock[0] = 1020.2
+    assert {job.name for job in scheduler._wait_for_due()} == {slow.name, fast.name}
+    assert slow.next_run == 1080
+
+    fast.running = False  # the slow job's tick is still in flight
+    clock[0] = 1080.1
+    assert scheduler._wait_for_due() == [fast]
+    assert "rsi:AAPL is still running; skipping tick." in caplog.text
+    assert slow.next_run == 1140
+
+    slow.running = fast.running = False
+    scheduler.remove_job(slow.name)
+    clock[0] = 1140.0
+    assert scheduler._wait_for_due() == [fast]
+    assert scheduler.jobs == [fast]
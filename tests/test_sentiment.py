@@ -0,0 +1,90 @@
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import execution
+import models
+from backtest import StubAPI
+from scheduler import Job, Scheduler
+from strategies import sentiment
+
+class CountingPipeline:
+    """Stands in for the transformers pipeline; texts containing "bad" are negative."""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, texts, **options):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return [{"label": "negative" if "bad" in text else "positive", "score": 0.9} for text in texts]
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    pipe = CountingPipeline()
+    monkeypatch.setattr(models, "get_pipeline", lambda task="sentiment-analysis", **kwargs: pipe)
+    monkeypatch.setattr(sentiment, "_cache", sentiment._ScoreCache(100, 60.0))
+    return pipe
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sentiment, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+def test_headlines_are_deduplicated_and_cached(pipeline):
+    results = sentiment.score_texts(["good news", "bad news", "good news", ""])
+    assert results == [("POSITIVE", 0.9), ("NEGATIVE", 0.9), ("POSITIVE", 0.9), None]
+    assert pipeline.calls == [["good news", "bad news"]]
+    sentiment.score_texts(["bad news", "more good news"])
+    assert pipeline.calls[1:] == [["more good news"]]
+
+def test_expired_scores_are_recomputed(pipeline, clock):
+    sentiment.score_texts(["good news"])
+    clock[0] += 30
+    sentiment.score_texts(["good news"])
+    assert len(pipeline.calls) == 1
+    clock[0] += 31
+    sentiment.score_texts(["good news"])
+    assert pipeline.calls == [["good news"], ["good news"]]
+
+def test_the_least_recently_used_score_is_evicted(clock):
+    cache = sentiment._ScoreCache(2, 60.0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+def test_a_failed_pipeline_call_scores_nothing_and_caches_nothing(pipeline):
+    pipeline.fail = True
+    assert sentiment.score_texts(["good news"]) == [None]
+    assert sentiment.get_sentiment(["good news"]) == "neutral"
+    pipeline.fail = False
+    assert sentiment.score_texts(["good news"]) == [("POSITIVE", 0.9)]
+
+def test_symbols_due_together_are_scored_in_one_call(pipeline, monkeypatch):
+    symbols = ["AAPL", "MSFT", "TSLA"]
+    monkeypatch.setattr(sentiment, "fetch_news_and_chat", lambda symbol: [f"{symbol} good news", f"{symbol} chat"])
+    index = pd.date_range("2024-01-02", periods=1, freq="min", tz="UTC")
+    bars = pd.DataFrame({"o": 10.0, "h": 10.0, "l": 10.0, "c": 10.0, "v": 1.0}, index=index)
+    api = StubAPI({symbol: bars for symbol in symbols})
+    execution.gateway_for(api, max_workers=0)
+    scheduler = Scheduler(api, max_workers=3)
+    ticked = {symbol: threading.Event() for symbol in symbols}
+    for symbol in symbols:
+        job = scheduler.add_job(Job(symbol, "sentiment", 100, 1))
+        monkeypatch.setattr(job.instance, "on_fill", lambda order, symbol=symbol: ticked[symbol].set())
+    thread = threading.Thread(target=scheduler.run_forever)
+    thread.start()
+    try:
+        assert all(event.wait(5) for event in ticked.values())
+    finally:
+        scheduler.stop()
+        thread.join(5)
+    assert pipeline.calls == [[text for symbol in symbols for text in (f"{symbol} good news", f"{symbol} chat")]]
+    assert api.positions == {symbol: 10 for symbol in symbols}
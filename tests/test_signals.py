@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import signals
+
+CASES = [
+    ("moving_average", {"short_window": 5, "long_window": 20}),
+    ("rsi", {"window": 14, "oversold": 30, "overbought": 70}),
+    ("bollinger_bands", {"window": 20, "num_std": 2}),
+    ("skLearn", {"trend_window": 20}),
+]
+
+def ragged_histories():
+    rng = np.random.default_rng(11)
+    lengths = {"AAA": 250, "BBB": 120, "CCC": 31, "DDD": 8, "EEE": 1}
+    return {symbol: 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, n))) for symbol, n in lengths.items()}
+
+def test_close_matrix_aligns_histories_on_the_newest_bar():
+    closes = ragged_histories()
+    symbols, matrix = signals.close_matrix(closes)
+    assert symbols == list(closes)
+    assert matrix.shape == (5, 250)
+    for row, symbol in enumerate(symbols):
+        n = len(closes[symbol])
+        assert np.isnan(matrix[row, :250 - n]).all()
+        np.testing.assert_array_equal(matrix[row, 250 - n:], closes[symbol])
+    _, short = signals.close_matrix(closes, length=10)
+    np.testing.assert_array_equal(short[0], closes["AAA"][-10:])
+
+@pytest.mark.parametrize("strategy,kwargs", CASES)
+def test_latest_signals_match_the_full_signal_of_every_row(strategy, kwargs):
+    fired = 0
+    for drop in range(40):  # the newest bar of 40 consecutive ticks
+        closes = {symbol: c[:len(c) - drop] for symbol, c in ragged_histories().items() if len(c) > drop}
+        symbols, matrix = signals.close_matrix(closes)
+        latest = signals.latest_signals(strategy, matrix, **kwargs)
+        expected = [signals.compute_signal(strategy, closes[symbol], **kwargs)[-1] for symbol in symbols]
+        np.testing.assert_array_equal(latest, expected)
+        fired += np.count_nonzero(latest)
+    assert fired  # the comparison covered actual signals, not just zeros
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+import backtest
+import sweep
+
+def random_walk_bars(seed, n=300):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    index = pd.date_range("2024-01-02", periods=n, freq="min", tz="UTC")
+    return pd.DataFrame({"o": close, "h": close, "l": close, "c": close, "v": 1.0}, index=index)
+
+def test_a_parallel_sweep_matches_direct_backtests():
+    bars = {"AAA": random_walk_bars(1), "BBB": random_walk_bars(2, 250)}
+    grid = {"window": [7, 14], "oversold": [25, 30], "overbought": [70]}
+    results = sweep.sweep({s: df["c"].to_numpy() for s, df in bars.items()}, "rsi", grid, 1000.0,
+                          slippage_bps=5.0, max_workers=2, chunk_size=1)
+    assert len(results) == 2 * 4
+    assert sorted((symbol, params["window"], params["oversold"]) for symbol, params, _ in results) == [
+        (symbol, window, oversold) for symbol in ("AAA", "BBB") for window in (7, 14) for oversold in (25, 30)]
+    for symbol, params, summary in results:
+        expected = backtest.backtest(bars[symbol], "rsi", 1000.0, slippage_bps=5.0, **params).summary
+        assert summary == expected
+
+def test_grid_values_that_are_not_json_are_kept_as_strings():
+    assert sweep._parse_grid("window=7,14") == ("window", [7, 14])
+    assert sweep._parse_grid("timeframe=1Min,1Day") == ("timeframe", ["1Min", "1Day"])
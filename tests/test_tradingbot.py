@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import presets
+import TradingBot
+
+def capture_run_fleet(monkeypatch):
+    calls = []
+    monkeypatch.setattr(TradingBot, "run_fleet", lambda *args, **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(TradingBot, "load_credentials", lambda: ("key", "secret", TradingBot.DEFAULT_BASE_URL))
+    return calls
+
+def test_headless_mode_streams_trade_updates_when_a_preset_asks(monkeypatch, tmp_path):
+    calls = capture_run_fleet(monkeypatch)
+    presets.save_preset("a", {"symbol": "AAPL", "strategy": "rsi", "dollar_amount": 100}, str(tmp_path))
+    TradingBot.run_headless(str(tmp_path))
+    presets.save_preset("b", {"symbol": "MSFT", "strategy": "rsi", "dollar_amount": 100,
+                              "stream_trade_updates": True}, str(tmp_path))
+    TradingBot.run_headless(str(tmp_path))
+    assert [kwargs["stream_trade_updates"] for kwargs in calls] == [False, True]
+
+def test_the_command_line_flag_reaches_run_fleet(monkeypatch, tmp_path):
+    calls = capture_run_fleet(monkeypatch)
+    TradingBot.run_headless(str(tmp_path), stream_trade_updates=True)
+    TradingBot.run_bot("key", "secret", TradingBot.DEFAULT_BASE_URL, "AAPL", 100, 60, "rsi",
+                       stream_trade_updates=True)
+    assert [kwargs["stream_trade_updates"] for kwargs in calls] == [True, True]
+
+def test_headless_mode_fails_cleanly_without_the_preset_directory(monkeypatch, tmp_path, caplog):
+    calls = capture_run_fleet(monkeypatch)
+    assert TradingBot.run_headless(str(tmp_path / "missing")) == 1
+    assert "does not exist" in caplog.text
+    assert calls == []
+
+def test_the_command_line_exits_non_zero_for_a_missing_preset_directory(tmp_path):
+    result = subprocess.run([sys.executable, "TradingBot.py", "--presets", str(tmp_path / "missing")],
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 1
+    assert "Traceback" not in result.stderr